@@ -0,0 +1,285 @@
+"""Shared client for the SpaceDevs API.
+
+Every fetcher goes through get_json() so responses are cached in one place,
+keyed by endpoint and query, with a TTL and LRU eviction.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+import fetch_engine
+import instrumentation
+import scheduler
+import transport
+
+BASE_URL = os.environ.get("SPACEDEVS_BASE_URL", "https://lldev.thespacedevs.com")
+CACHE_TTL = float(os.environ.get("SPACEDEVS_CACHE_TTL", 600))  # seconds
+CACHE_MAX_ENTRIES = int(os.environ.get("SPACEDEVS_CACHE_MAX_ENTRIES", 256))
+REQUEST_TIMEOUT = 20  # seconds
+PAGE_SIZE = 100  # largest page the SpaceDevs API serves
+# Upstream quotas as "requests/seconds"; SPACEDEVS_RATE_LIMIT overrides, "0" disables
+DEFAULT_QUOTAS = {"ll.thespacedevs.com": "15/3600"}
+RATE_LIMIT = os.environ.get("SPACEDEVS_RATE_LIMIT", DEFAULT_QUOTAS.get(urlparse(BASE_URL).netloc, ""))
+RATE_MAX_WAIT = float(os.environ.get("SPACEDEVS_RATE_MAX_WAIT", 30))  # seconds a foreground request queues
+RETRY_STATUSES = {429, 503}
+MAX_RETRIES = 3
+MAX_RETRY_WAIT = 60  # seconds; a longer Retry-After fails the request instead
+BACKOFF = 1  # seconds when there is no Retry-After, doubled after every attempt
+PAGE_WORKERS = int(os.environ.get("SPACEDEVS_PAGE_WORKERS", 4))  # pages per window when stopping early
+
+
+class APIError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, value) and count the lookup as a hit or a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._data),
+                    "max_entries": self.max_entries, "ttl": self.ttl}
+
+
+_cache = TTLCache()
+_session = transport.new_session(pool_maxsize=fetch_engine.MAX_PER_HOST)
+_host = urlparse(BASE_URL).netloc
+_bucket = scheduler.TokenBucket(scheduler.parse_quota(RATE_LIMIT))
+_in_flight = scheduler.Coalescer()
+
+
+def configure(ttl=None, max_entries=None):
+    """Change the response cache TTL (seconds) and/or its maximum size."""
+    if ttl is not None:
+        _cache.ttl = ttl
+    if max_entries is not None:
+        _cache.max_entries = max_entries
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def build_url(endpoint, params=None):
+    url = BASE_URL + endpoint
+    if params:
+        url += "?" + urlencode(params)
+    return url
+
+
+def _cache_key(endpoint, params):
+    return endpoint, tuple(sorted((params or {}).items()))
+
+
+def get_json(endpoint, params=None, use_cache=True):
+    """GET `endpoint` (e.g. "/2.3.0/astronauts/") and return the decoded JSON.
+
+    Identical requests already in flight (from any session) are shared
+    rather than sent again. Raises APIError when the request fails or does
+    not return 200.
+    """
+    with instrumentation.span("http.api", endpoint=endpoint) as span:
+        key = _cache_key(endpoint, params)
+        if use_cache:
+            found, data = _cache.get(key)
+            span["cache"] = "hit" if found else "miss"
+            if found:
+                return data
+
+        data, shared = _in_flight.run(key, lambda: _request(endpoint, params, span))
+        if shared:
+            span["cache"] = "coalesced"
+        if use_cache:
+            _cache.set(key, data)
+        return data
+
+
+def _request(endpoint, params, span):
+    """Send one API request under the rate limiter, retrying 429/503 responses."""
+    url = build_url(endpoint, params)
+    priority = scheduler.current_priority()
+    for attempt in range(MAX_RETRIES + 1):
+        wait = None if priority == scheduler.BACKGROUND else RATE_MAX_WAIT
+        if not _bucket.acquire(priority, timeout=wait):
+            raise APIError(f"Rate limited: no request slot for {url} within {RATE_MAX_WAIT:.0f}s", 429)
+        try:
+            response = _session.get(url, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as exc:
+            raise APIError(f"Request to {url} failed: {exc}") from exc
+        span["status"] = response.status_code
+        span["bytes"] = len(response.content)
+
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            delay = scheduler.retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = BACKOFF * 2 ** attempt
+            if delay <= MAX_RETRY_WAIT:
+                # Everyone waits: the quota is per client, not per request
+                _bucket.pause(delay)
+                span["retries"] = attempt + 1
+                continue
+        if response.status_code != 200:
+            raise APIError(f"{url} returned HTTP {response.status_code}", response.status_code)
+
+        with instrumentation.span("json.parse", endpoint=endpoint):
+            return response.json()
+
+
+def _next_request(next_url):
+    """Split an API `next` link into (endpoint, params) so it shares the cache."""
+    parsed = urlparse(next_url)
+    return parsed.path, dict(parse_qsl(parsed.query))
+
+
+async def _get_pages(fetch_page, params_list):
+    return await asyncio.gather(*(fetch_engine.call(fetch_page, p, host=_host) for p in params_list))
+
+
+def iter_pages(endpoint, params=None, page_size=PAGE_SIZE, max_workers=PAGE_WORKERS, use_cache=True,
+               on_count=None):
+    """Yield the `results` list of every page of a collection, in order.
+
+    The first page tells us the total `count` (passed to `on_count`, if
+    given, before anything is yielded; None when the API omits it); the
+    remaining offsets are then fetched `max_workers` pages at a time on the
+    fetch engine. Without a count we fall back to following `next` links
+    one by one. Stopping iteration early skips any page windows not yet
+    requested.
+    """
+    params = dict(params or {})
+    params["limit"] = page_size
+    params["offset"] = 0
+    first = get_json(endpoint, params, use_cache)
+    count = first.get("count")
+    if on_count is not None:
+        on_count(count)
+    yield first.get("results", [])
+
+    if count is None:
+        next_url = first.get("next")
+        while next_url:
+            next_endpoint, next_params = _next_request(next_url)
+            page = get_json(next_endpoint, next_params, use_cache)
+            yield page.get("results", [])
+            next_url = page.get("next")
+        return
+
+    offsets = list(range(page_size, count, page_size))
+    fetch_page = lambda p: get_json(endpoint, p, use_cache)
+    for start in range(0, len(offsets), max_workers):
+        window = [dict(params, offset=offset) for offset in offsets[start:start + max_workers]]
+        for page in fetch_engine.run(_get_pages(fetch_page, window)):
+            yield page.get("results", [])
+
+
+async def collect(endpoint, params=None, page_size=PAGE_SIZE, use_cache=True):
+    """Coroutine returning every record of a collection.
+
+    After the first page all remaining pages are requested at once; the
+    fetch engine's caps decide how many are actually in flight.
+    """
+    params = dict(params or {}, limit=page_size, offset=0)
+    fetch_page = lambda p: get_json(endpoint, p, use_cache)
+    first = await fetch_engine.call(fetch_page, params, host=_host)
+    records = list(first.get("results", []))
+
+    count = first.get("count")
+    if count is None:
+        next_url = first.get("next")
+        while next_url:
+            next_endpoint, next_params = _next_request(next_url)
+            page = await fetch_engine.call(lambda p: get_json(next_endpoint, p, use_cache), next_params, host=_host)
+            records.extend(page.get("results", []))
+            next_url = page.get("next")
+        return records
+
+    window = [dict(params, offset=offset) for offset in range(page_size, count, page_size)]
+    for page in await _get_pages(fetch_page, window):
+        records.extend(page.get("results", []))
+    return records
+
+
+def fetch_all(endpoint, params=None, want=None, predicate=None, page_size=PAGE_SIZE, use_cache=True, parse=None):
+    """Return every record of a paginated collection.
+
+    With `parse`, each raw result is passed through it (e.g. a records.py
+    parser) and `predicate` sees the parsed records. With `want`, stop after
+    the page on which `want` records satisfying `predicate` (or any records,
+    when no predicate is given) have been seen. All records from the pages
+    fetched are returned; filtering is left to the caller, which must not
+    modify the returned list.
+    """
+    if want is None:
+        # Whole collections are cached as parsed records instead of raw pages,
+        # so a warm rerun gets the very same list object back and per-dataset
+        # structures keyed on it can be reused.
+        collection_key = ("collection", _cache_key(endpoint, params), page_size, parse)
+        if use_cache:
+            found, records = _cache.get(collection_key)
+            if found:
+                return records
+        records = fetch_engine.run(collect(endpoint, params, page_size, use_cache=False))
+        if parse is not None:
+            records = [parse(r) for r in records]
+        if use_cache:
+            _cache.set(collection_key, records)
+        return records
+
+    if predicate is None:
+        page_size = max(1, min(page_size, want))
+    records = []
+    matches = 0
+    for results in iter_pages(endpoint, params, page_size, use_cache=use_cache):
+        if parse is not None:
+            results = [parse(r) for r in results]
+        records.extend(results)
+        matches += len(results) if predicate is None else sum(1 for r in results if predicate(r))
+        if matches >= want:
+            break
+    return records
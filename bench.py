@@ -0,0 +1,252 @@
+"""Benchmarks for the fetch/filter/render/export hot paths.
+
+Times parsing API results into records, rows_from_launch_results, the
+filter_* stages (cold, building their index or columns, and warm),
+saveLaunchData (csv and xlsx) and build_zip_from_images at increasing
+payload sizes and prints the results as JSON, so runs from different
+versions can be diffed.
+
+Payloads are built from recorded API pages when --fixtures points at a
+directory written with SPACEDEVS_HTTP_MODE=record (see transport.py), and
+from built-in sample records otherwise; either way records are repeated
+with fresh ids to reach each size. Image downloads hit a local HTTP server
+started by this script, never the real CDN.
+
+    python bench.py --sizes 100 1000 10000 --output bench.json
+"""
+import argparse
+import copy
+import gzip
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The image stand-in is a local server, so downloads must really go out.
+os.environ["SPACEDEVS_HTTP_MODE"] = "live"
+
+import columnar  # noqa: E402
+import functions  # noqa: E402
+import image_cache  # noqa: E402
+import indexes  # noqa: E402
+import records  # noqa: E402
+
+SAMPLES = {
+    "celestial_bodies": {
+        "id": 1, "name": "Moon", "description": "Earth's only natural satellite.", "diameter": 3474.8,
+        "mass": 7.342e22, "gravity": 1.62, "image": {"image_url": "https://example.invalid/moon.jpg"},
+    },
+    "astronauts": {
+        "id": 1, "name": "Neil Armstrong", "agency": {"name": "National Aeronautics and Space Administration"},
+        "nationality": [{"nationality_name": "American"}], "image": {"image_url": "https://example.invalid/a.jpg"},
+        "age": 82, "date_of_birth": "1930-08-05", "flights_count": 2, "last_flight": "1969-07-16T13:32:00Z",
+        "status": {"name": "Deceased"},
+    },
+    "spacecraft": {
+        "id": 1, "name": "Dragon C206", "description": "Crew Dragon capsule.", "in_space": False,
+        "status": {"name": "Active"}, "image": {"image_url": "https://example.invalid/s.jpg"},
+    },
+    "launchers": {
+        "id": 1, "serial_number": "B1049", "launcher_config": {"full_name": "Falcon 9 Block 5"},
+        "details": "Booster.", "status": {"name": "Active"}, "flights": 11, "flight_proven": True,
+        "attempted_landings": 10, "successful_landings": 10, "image": {"image_url": "https://example.invalid/l.jpg"},
+    },
+    "launches": {
+        "id": "e3df2ecd-c239-472f-95e4-2b89b4f75800", "name": "Falcon 9 Block 5 | Starlink Group 6-1",
+        "launch_service_provider": {"name": "SpaceX"}, "rocket": {"configuration": {"name": "Falcon 9"}},
+        "mission": {"name": "Starlink Group 6-1", "type": "Communications", "description": "A batch of satellites."},
+        "window_start": "2023-02-27T23:13:00Z", "window_end": "2023-02-28T02:43:00Z",
+        "pad": {"name": "Space Launch Complex 40", "location": {"name": "Cape Canaveral, FL, USA"}},
+    },
+}
+
+# URL path fragment identifying each entity's endpoint in recorded fixtures
+ENDPOINTS = {
+    "celestial_bodies": "/celestial_bodies/",
+    "astronauts": "/astronauts",
+    "spacecraft": "/spacecraft/",
+    "launchers": "/launchers/",
+    "launches": "/launch/",
+}
+
+FILTER_SPECS = {
+    "celestial_bodies": (functions.filter_celestial_bodies, {"name_filter": "moon"}),
+    "astronauts": (functions.filter_astronauts, {"nationality_filter": "American", "min_flights": 1, "max_flights": 5}),
+    "spacecraft": (functions.filter_spacecraft, {"status_filter": "Active", "in_space_filter": False}),
+    "launchers": (functions.filter_launchers, {"status_filter": "Active", "flight_proven_filter": True}),
+}
+
+
+def load_recorded(fixtures_dir):
+    """Collect recorded `results` records per entity from a fixtures directory."""
+    records = {entity: [] for entity in ENDPOINTS}
+    for root, _, files in os.walk(fixtures_dir):
+        for name in files:
+            if not name.endswith(".gz"):
+                continue
+            with gzip.open(os.path.join(root, name), "rb") as f:
+                header_line, _, body = f.read().partition(b"\n")
+            url = json.loads(header_line)["url"]
+            for entity, fragment in ENDPOINTS.items():
+                if fragment in url:
+                    try:
+                        records[entity].extend(json.loads(body).get("results", []))
+                    except ValueError:
+                        pass
+                    break
+    return records
+
+
+def scale(templates, size):
+    """Repeat `templates` with fresh ids and names until there are `size` records."""
+    records = []
+    for i in range(size):
+        record = copy.deepcopy(templates[i % len(templates)])
+        record["id"] = i
+        record["name"] = f"{record.get('name', 'record')} #{i}"
+        records.append(record)
+    return records
+
+
+def timeit(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+    }
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    body = os.urandom(50 * 1024)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_image_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, zip_sizes, fixtures_dir=None):
+    recorded = load_recorded(fixtures_dir) if fixtures_dir else {}
+    results = []
+
+    def record(name, size, fn, n=repeat):
+        try:
+            timing = timeit(fn, n)
+        except ImportError as exc:
+            timing = {"skipped": str(exc)}
+        results.append(dict(name=name, size=size, **timing))
+
+    for size in sizes:
+        payloads = {
+            entity: scale(recorded.get(entity) or [sample], size)
+            for entity, sample in SAMPLES.items()
+        }
+        for entity, raw in payloads.items():
+            parse = records.PARSERS[entity]
+            record(f"parse_{entity}", size, lambda: [parse(r) for r in raw])
+        parsed = {entity: [records.PARSERS[entity](r) for r in raw] for entity, raw in payloads.items()}
+
+        launches = parsed["launches"]
+        record("rows_from_launch_results", size, lambda: functions.rows_from_launch_results(launches))
+        for entity, (filter_fn, spec) in FILTER_SPECS.items():
+            entity_records = parsed[entity]
+
+            def cold():
+                # Drop the memoized index/columns so they are rebuilt inside the timing
+                indexes.forget(entity_records)
+                columnar.forget(entity_records)
+                filter_fn(entity_records, spec)
+
+            record(f"filter_{entity}_cold", size, cold)
+            record(f"filter_{entity}", size, lambda: filter_fn(entity_records, spec))
+
+        rows = functions.rows_from_launch_results(launches)
+        record("saveLaunchData_csv", size, lambda: functions.saveLaunchData(rows, "csv"))
+        record("saveLaunchData_xlsx", size, lambda: functions.saveLaunchData(rows, "xlsx"))
+
+    server = start_image_server()
+    host, port = server.server_address
+    cache_dirs = []
+    try:
+        for size in zip_sizes:
+            image_list = [(f"image {i}", f"http://{host}:{port}/img/{i}.jpg") for i in range(size)]
+
+            def build_cold():
+                image_cache.CACHE_DIR = tempfile.mkdtemp(prefix="bench-images-")
+                cache_dirs.append(image_cache.CACHE_DIR)
+                functions.build_zip_from_images(image_list).close()
+
+            record("build_zip_from_images_cold", size, build_cold)
+            record("build_zip_from_images_warm", size,
+                   lambda: functions.build_zip_from_images(image_list).close())
+    finally:
+        server.shutdown()
+        for directory in cache_dirs:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixtures": fixtures_dir,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Space Data Explorer hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="record counts to test")
+    parser.add_argument("--zip-sizes", type=int, nargs="+", default=[10, 100], help="image counts for ZIP builds")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--fixtures", help="directory of recorded API responses to build payloads from")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, args.zip_sizes, args.fixtures)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Columnar, NumPy-backed views over astronaut records.
+
+The records (see records.py) are walked once per dataset to build the
+columns the astronaut filters use: integer flight counts and
+dictionary-encoded categoricals (agency, nationality). Filters then become
+vectorized mask operations instead of Python loops.
+
+Columns are memoized on the identity of the records list, so a rerun that
+gets the same list back from the API cache reuses them. Launches have a
+time-sorted structure of their own in launch_browser.py.
+"""
+import numpy as np
+
+import memo
+
+_MEMO_SIZE = 16
+
+
+class Categorical:
+    """Dictionary-encoded strings: int32 codes into a list of categories."""
+
+    MISSING = -1
+
+    def __init__(self, values):
+        lookup = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = self.MISSING
+            else:
+                codes[i] = lookup.setdefault(value, len(lookup))
+        self.codes = codes
+        self.categories = list(lookup)
+        self._lookup = lookup
+
+    def code_of(self, value):
+        return self._lookup.get(value, self.MISSING - 1)  # never matches a row
+
+    def mask(self, value):
+        return self.codes == self.code_of(value)
+
+
+class AstronautColumns:
+    def __init__(self, astronauts):
+        self.records = astronauts
+        # Only what mask() reads, so the rebuild after a refresh stays cheap
+        self.agency = Categorical([a.agency for a in astronauts])
+        self.nationality = Categorical([a.nationality for a in astronauts])
+        self.flights_count = np.array([a.flights_count for a in astronauts], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.records)
+
+    def mask(self, agency=None, nationality=None, min_flights=None, max_flights=None):
+        mask = np.ones(len(self.records), dtype=bool)
+        if agency is not None:
+            mask &= self.agency.mask(agency)
+        if nationality is not None:
+            mask &= self.nationality.mask(nationality)
+        if min_flights is not None:
+            mask &= self.flights_count >= min_flights
+        if max_flights is not None:
+            mask &= self.flights_count <= max_flights
+        return mask
+
+
+def _nbytes(columns):
+    total = 0
+    for value in vars(columns).values():
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif isinstance(value, Categorical):
+            total += value.codes.nbytes
+    return total
+
+
+_memo = memo.IdentityMemo(max_entries=_MEMO_SIZE, weigh=_nbytes)
+forget = _memo.forget
+
+
+def memo_stats():
+    """Number of memoized column sets and the bytes held by their arrays."""
+    return _memo.stats()
+
+
+def astronaut_columns(astronauts):
+    return _memo.get_or_build(astronauts, lambda: AstronautColumns(astronauts), AstronautColumns)
+
+
+def select(records, mask, limit=None):
+    """Records whose mask entry is set, in their original order."""
+    return [records[i] for i in np.flatnonzero(mask)[:limit]]
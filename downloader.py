@@ -0,0 +1,161 @@
+"""Concurrent image downloads over a pooled HTTP session.
+
+Bodies are streamed in CHUNK_SIZE pieces straight into the on-disk image
+cache, so a download never holds a whole image in memory. iter_files()
+runs a batch on a bounded thread pool and yields the cached file paths in
+input order as soon as each one (and every one before it) is ready, which
+lets build_zip_from_images write entries while later downloads are still
+running and keeps the archive order deterministic.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import image_cache
+import instrumentation
+import transport
+
+MAX_WORKERS = int(os.environ.get("SPACEDEVS_DOWNLOAD_WORKERS", 8))
+REQUEST_TIMEOUT = 15  # seconds allowed for a single download, body included
+OVERALL_DEADLINE = 60  # seconds allowed for a whole batch
+RETRIES = 2
+BACKOFF = 0.5  # seconds, doubled after every failed attempt
+CHUNK_SIZE = 64 * 1024
+
+# Status codes worth retrying; anything else is treated as a permanent failure.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = transport.new_session(pool_maxsize=MAX_WORKERS)
+
+
+class DownloadError(Exception):
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _remaining(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _get_once(url, timeout, deadline, headers, handle):
+    """GET `url` and pass (chunks, response headers) to handle().
+
+    `chunks` is None for a 304 Not Modified; otherwise it is an iterator over
+    the body that raises DownloadError once the request deadline passes.
+    """
+    started = time.monotonic()
+    request_deadline = started + timeout
+    if deadline is not None:
+        request_deadline = min(request_deadline, deadline)
+    socket_timeout = max(request_deadline - started, 0.1)
+
+    with _session.get(url, headers=headers, timeout=socket_timeout, stream=True) as response:
+        if response.status_code == 304:
+            return handle(None, response.headers)
+        if response.status_code != 200:
+            raise DownloadError(f"{url} returned HTTP {response.status_code}",
+                                retryable=response.status_code in RETRY_STATUSES)
+
+        def chunks():
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if time.monotonic() > request_deadline:
+                    raise DownloadError(f"{url} timed out", retryable=True)
+                yield chunk
+
+        return handle(chunks(), response.headers)
+
+
+def _with_retries(url, attempt_once, retries, backoff, deadline):
+    attempt = 0
+    while True:
+        try:
+            return attempt_once()
+        except (requests.RequestException, DownloadError) as exc:
+            retryable = getattr(exc, "retryable", True)
+            delay = backoff * (2 ** attempt)
+            remaining = _remaining(deadline)
+            if not retryable or attempt >= retries or (remaining is not None and remaining <= delay):
+                raise DownloadError(f"Failed to download {url}: {exc}") from exc
+            time.sleep(delay)
+            attempt += 1
+
+
+def fetch_to_file(url, timeout=REQUEST_TIMEOUT, retries=RETRIES, backoff=BACKOFF, deadline=None):
+    """Make sure `url` is in the image cache and return the cached file path.
+
+    Fresh entries are returned without any request and stale ones are
+    revalidated with a conditional GET. `deadline` is an absolute
+    time.monotonic() value shared by a whole batch; no attempt or backoff
+    sleep is started past it.
+    """
+    with instrumentation.span("http.image", url=url) as span:
+        meta = image_cache.lookup(url)
+        if meta is not None and image_cache.is_fresh(meta):
+            span["cache"] = "hit"
+            # Callers open the file directly, so mark it used for LRU eviction here
+            return image_cache.touch(url)
+        span["cache"] = "miss" if meta is None else "revalidate"
+        return _download_to_cache(url, meta, span, timeout, retries, backoff, deadline)
+
+
+def _download_to_cache(url, meta, span, timeout, retries, backoff, deadline):
+    state = {"headers": image_cache.validators(meta) if meta is not None else None}
+
+    def handle(chunks, response_headers):
+        if chunks is None:
+            image_cache.mark_revalidated(url, meta or {}, response_headers)
+            return image_cache.path_for(url)
+        span["bytes"] = 0
+
+        def counted():
+            for chunk in chunks:
+                span["bytes"] += len(chunk)
+                yield chunk
+        return image_cache.store_stream(url, counted(), response_headers)
+
+    def attempt_once():
+        path = _get_once(url, timeout, deadline, state["headers"], handle)
+        if not os.path.exists(path):
+            # Entry was evicted between lookup and revalidation; fetch it unconditionally
+            state["headers"] = None
+            raise DownloadError(f"{url} was evicted while revalidating", retryable=True)
+        return path
+
+    return _with_retries(url, attempt_once, retries, backoff, deadline)
+
+
+def _run_batch(fetch, urls, max_workers, timeout, deadline, retries, backoff):
+    """Yield each fetch() result (or None on failure/deadline) in input order."""
+    urls = list(urls)
+    if not urls:
+        return
+    batch_deadline = time.monotonic() + deadline if deadline is not None else None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+    try:
+        futures = [
+            executor.submit(instrumentation.bind(fetch), url, timeout, retries, backoff, batch_deadline)
+            for url in urls
+        ]
+        for future in futures:
+            remaining = _remaining(batch_deadline)
+            try:
+                yield future.result(timeout=None if remaining is None else max(remaining, 0))
+            except Exception:
+                yield None  # failed, or still running at the batch deadline
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_files(urls, max_workers=MAX_WORKERS, timeout=REQUEST_TIMEOUT,
+               deadline=OVERALL_DEADLINE, retries=RETRIES, backoff=BACKOFF):
+    """Download every URL concurrently into the image cache.
+
+    Yields one cached file path per URL, in input order. Failed downloads,
+    and downloads still running when the overall deadline (in seconds)
+    expires, yield None.
+    """
+    return _run_batch(fetch_to_file, urls, max_workers, timeout, deadline, retries, backoff)
@@ -0,0 +1,250 @@
+"""Dataset exports as CSV, JSON Lines, Parquet or XLSX.
+
+Writers take the column names and an iterable of row pages (lists of
+dicts) and write straight to a binary file, one page at a time, so a
+streamed export never holds more than a page. XLSX is written by hand as
+a minimal single-sheet workbook (inline strings, no styles), so none of
+the formats needs pandas; Parquet needs pyarrow, imported on first use.
+
+prepare() starts encoding a whole records list on a worker pool and
+returns a Future; the bytes are cached on the identity of the list (see
+memo.py). Downloading the same snapshot again, in any session, reuses the
+cached file, and concurrent requests for one file share a single encoding.
+"""
+import csv
+import json
+import math
+import os
+import re
+import threading
+import zipfile
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO, TextIOWrapper
+from xml.sax.saxutils import escape
+
+import memo
+
+WORKERS = int(os.environ.get("SPACEDEVS_EXPORT_WORKERS", 4))
+CACHE_MAX_BYTES = int(os.environ.get("SPACEDEVS_EXPORT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def _detach(text):
+    text.flush()
+    text.detach()  # leave `out` open for the caller
+
+
+def write_csv(fields, pages, out):
+    """Write row pages to `out` as CSV with a header row; return the row count."""
+    text = TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    written = 0
+    for rows in pages:
+        writer.writerows(rows)
+        written += len(rows)
+    _detach(text)
+    return written
+
+
+def write_jsonl(fields, pages, out):
+    """Write row pages to `out` as one JSON object per line."""
+    text = TextIOWrapper(out, encoding="utf-8", newline="")
+    written = 0
+    for rows in pages:
+        for row in rows:
+            text.write(json.dumps({name: row.get(name) for name in fields}, ensure_ascii=False, default=str))
+            text.write("\n")
+        written += len(rows)
+    _detach(text)
+    return written
+
+
+def write_parquet(fields, pages, out):
+    """Write row pages to `out` as Parquet, typed from the first page.
+
+    Columns the first page has no values for are written as strings.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    written = 0
+    try:
+        for rows in pages:
+            if writer is None:
+                inferred = pa.Table.from_pylist(rows).schema
+                types = {f.name: f.type for f in inferred if not pa.types.is_null(f.type)}
+                writer = pq.ParquetWriter(out, pa.schema([(name, types.get(name, pa.string())) for name in fields]))
+            writer.write_table(pa.Table.from_pylist(rows, schema=writer.schema))
+            written += len(rows)
+        if writer is None:
+            writer = pq.ParquetWriter(out, pa.schema([(name, pa.string()) for name in fields]))
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+        return f"<c><v>{value!r}</v></c>"
+    text = escape(_XML_INVALID.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def write_xlsx(fields, pages, out):
+    """Write row pages to `out` as a single-sheet XLSX workbook with a header row."""
+    written = 0
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in _XLSX_PARTS.items():
+            archive.writestr(name, xml)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(("<row>" + "".join(_xlsx_cell(name) for name in fields) + "</row>").encode("utf-8"))
+            for rows in pages:
+                sheet.write("".join(
+                    "<row>" + "".join(_xlsx_cell(row.get(name)) for name in fields) + "</row>" for row in rows
+                ).encode("utf-8"))
+                written += len(rows)
+            sheet.write(b"</sheetData></worksheet>")
+    return written
+
+
+Format = namedtuple("Format", "mime write")
+
+FORMATS = {
+    "csv": Format("text/csv", write_csv),
+    "jsonl": Format("application/x-ndjson", write_jsonl),
+    "parquet": Format("application/vnd.apache.parquet", write_parquet),
+    "xlsx": Format("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx),
+}
+
+
+def write(file_format, fields, pages, out):
+    """Write row pages to the binary file `out` in `file_format`; return the row count."""
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported export format {file_format!r}")
+    return FORMATS[file_format].write(fields, pages, out)
+
+
+def encode(file_format, fields, rows):
+    """`rows` in `file_format`, as bytes."""
+    out = BytesIO()
+    write(file_format, fields, [rows], out)
+    return out.getvalue()
+
+
+def _cached_bytes(future):
+    # Encodings still running (or failed) don't count yet
+    return len(future.result()) if future.done() and not future.exception() else 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_cache = memo.IdentityMemo(weigh=_cached_bytes, max_weight=CACHE_MAX_BYTES)
+forget = _cache.forget
+
+
+def _submit(fn, *args):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="spacedevs-export")
+        return _pool.submit(fn, *args)
+
+
+def _key(file_format, fields, to_rows, limit):
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported export format {file_format!r}")
+    return (file_format, tuple(fields), to_rows, limit)
+
+
+def cached(records, file_format, fields, to_rows, limit=None):
+    """The Future of an encoding already started (or done) for these arguments, or None."""
+    future = _cache.get(records, _key(file_format, fields, to_rows, limit))
+    if future is not None and future.done() and future.exception() is not None:
+        return None
+    return future
+
+
+def prepare(records, file_format, fields, to_rows, limit=None):
+    """Start encoding the first `limit` of `records` (all by default) on the pool; return its Future.
+
+    `to_rows(records)` turns records into row dicts keyed by `fields`. The
+    bytes are cached for this records list until forget() is called for
+    it, and callers asking for the same file share one encoding. Several
+    files can be prepared at once and waited for afterwards.
+    """
+    key = _key(file_format, fields, to_rows, limit)
+    future = cached(records, file_format, fields, to_rows, limit)
+    if future is None:
+        placeholder = Future()
+        future = _cache.setdefault(records, placeholder, key)
+        if future is not placeholder and future.done() and future.exception() is not None:
+            # A failed earlier attempt; try again
+            _cache.discard(records, key, future)
+            future = _cache.setdefault(records, placeholder, key)
+        if future is placeholder:
+            # Only the caller whose placeholder was stored runs the encoding
+            placeholder.add_done_callback(lambda _: _cache.trim())  # now that its size is known
+            _submit(_encode_into, placeholder, file_format, fields, to_rows, records[:limit])
+    return future
+
+
+def export(records, file_format, fields, to_rows, limit=None):
+    """Like prepare(), but wait for the bytes."""
+    return prepare(records, file_format, fields, to_rows, limit).result()
+
+
+def _encode_into(future, file_format, fields, to_rows, records):
+    try:
+        future.set_result(encode(file_format, fields, to_rows(records)))
+    except BaseException as exc:
+        future.set_exception(exc)
@@ -0,0 +1,87 @@
+"""One asyncio event loop for all concurrent HTTP work.
+
+The loop runs on a daemon thread for the life of the process. Blocking
+calls (requests sessions are not async) are scheduled on it with call(),
+which runs them on the loop's executor once a slot is free under both the
+global cap (MAX_CONCURRENCY) and the cap for their host
+(MAX_PER_HOST). Code that is not async itself, like the Streamlit script
+or the refresher's workers, uses the run() and gather_calls() facades.
+
+Because every caller shares the loop and its limits, many collections can
+be requested at once without opening more connections than the caps allow.
+Context variables (e.g. the instrumentation run) follow the work from the
+caller of run() into the loop and on to the executor threads.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_CONCURRENCY = int(os.environ.get("SPACEDEVS_MAX_CONCURRENCY", 16))
+MAX_PER_HOST = int(os.environ.get("SPACEDEVS_MAX_PER_HOST", 8))
+
+_lock = threading.Lock()
+_loop = None
+_thread = None
+_executor = None
+_limit = None
+_host_limits = {}
+
+
+def _start():
+    global _loop, _thread, _executor, _limit
+    with _lock:
+        if _loop is not None:
+            return _loop
+        loop = asyncio.new_event_loop()
+        _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="spacedevs-io")
+        _limit = asyncio.Semaphore(MAX_CONCURRENCY)
+        _thread = threading.Thread(target=loop.run_forever, name="spacedevs-fetch-engine", daemon=True)
+        _thread.start()
+        _loop = loop
+        return loop
+
+
+def _host_limit(host):
+    # Only touched from the loop thread, so no lock needed
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits[host] = asyncio.Semaphore(MAX_PER_HOST)
+    return limit
+
+
+async def call(fn, *args, host=None):
+    """Run the blocking fn(*args) on the executor within the concurrency caps."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    async with _limit:
+        if host is None:
+            return await loop.run_in_executor(_executor, context.run, fn, *args)
+        async with _host_limit(host):
+            return await loop.run_in_executor(_executor, context.run, fn, *args)
+
+
+def run(coro):
+    """Run `coro` on the engine's loop and block until it finishes."""
+    loop = _start()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("fetch_engine.run() called from the engine's own loop")
+    context = contextvars.copy_context()
+
+    async def in_callers_context():
+        # A task copies the context it is created in (create_task's context=
+        # argument would do the same but needs Python 3.11)
+        return await context.run(asyncio.ensure_future, coro)
+    return asyncio.run_coroutine_threadsafe(in_callers_context(), loop).result()
+
+
+def gather_calls(*fns):
+    """Run blocking zero-argument callables at once; return results or exceptions in order.
+
+    They run on the loop's default executor, not the capped one, so they may
+    themselves use run() without starving the requests they wait on.
+    """
+    async def gather():
+        return await asyncio.gather(*(asyncio.to_thread(fn) for fn in fns), return_exceptions=True)
+    return run(gather())
@@ -1,228 +1,434 @@
-import requests
-from urllib.error import HTTPError
-from datetime import datetime, timezone
-import time
-import matplotlib.pyplot as plt
-import numpy as np
-from IPython.display import display, clear_output, Image
+from datetime import date, datetime
 import streamlit as st
-from io import BytesIO
+import os
 import zipfile
+import shutil
+import tempfile
+import threading
 import time
+from collections import OrderedDict
+import api_client
+import columnar
+import indexes
+import downloader
+import exporters
+import fetch_engine
+import instrumentation
+import launch_browser
+import mirror
+import queries
+import records
+import refresher
+import thumbnails
+from api_client import APIError
+
+# Each entity type goes through three stages:
+#   fetch_*  -> parsed records (records.py) from the API (cached by api_client) or the local mirror
+#   filter_* -> pure function of (records, filter spec), no Streamlit calls
+#   render_* -> st.markdown cards for already-filtered records
+# The sd_* functions below chain the three for callers that want one call.
+# Each filter_* is built on a *_matcher(spec) predicate, which the fetch
+# stage also accepts so pagination can stop once enough matches are in.
+# The sd_* wrappers push what they can into the API query (see queries.py)
+# and only match the residual spec locally. Records are the slotted types
+# from records.py, parsed as each page arrives.
+
+
+def _with_count(facet):
+    """selectbox format_func showing how many records have each value."""
+    return lambda value: value if value == "All" else f"{value} ({facet.count(value)})"
+
+
+PAGE_SIZES = [5, 10, 25, 50]
+
+
+def paged(items, key, page_size=10):
+    """Show page controls for `items` and return only the current page.
+
+    Only the returned window gets rendered, so the page sent to the browser
+    stays small however many records matched.
+    """
+    total = len(items)
+    if total <= PAGE_SIZES[0]:
+        return items
+    size_col, page_col = st.columns(2)
+    size = size_col.selectbox("Cards per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size), key=f"{key}_page_size")
+    pages = -(-total // size)
+    # The page lives only in session state (no widget default), so it can be
+    # clamped when a narrower filter or bigger pages leave it past the end
+    st.session_state.setdefault(f"{key}_page", 1)
+    if st.session_state[f"{key}_page"] > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = page_col.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page - 1) * size
+    st.caption(f"Showing {start + 1}-{min(start + size, total)} of {total} (page {page} of {pages})")
+    return items[start:start + size]
+
+
+def collect_images(records):
+    """Return [(name, image_url), ...] for the records that have an image."""
+    return [(record.name, record.image_url) for record in records if record.image_url]
+
+
+# ========================================
+# CELESTIAL BODIES
+# ========================================
+@instrumentation.traced("fetch.celestial_bodies")
+def fetch_celestial_bodies(params=None, want=None, predicate=None, use_cache=True):
+    """All celestial bodies, or just enough pages for `want` records matching `predicate`.
+
+    `params` are extra API query parameters, e.g. from queries.build_query().
+    """
+    if mirror.enabled():
+        return mirror.fetch("celestial_bodies", params, want, predicate, records.CelestialBody.from_api)
+    return api_client.fetch_all(
+        "/2.3.0/celestial_bodies/", {"mode": "detailed", **(params or {})}, want=want, predicate=predicate, use_cache=use_cache,
+        parse=records.CelestialBody.from_api,
+    )
+
+
+def celestial_body_matcher(spec):
+    name_filter = (spec.get("name_filter") or "").lower()
+    return lambda c: not name_filter or name_filter in c.name.lower()
+
+
+def celestial_body_index(records):
+    return indexes.index_for("celestial_bodies", records, name_of=lambda c: c.name)
+
+
+@instrumentation.traced("filter.celestial_bodies")
+def filter_celestial_bodies(records, spec, limit=None):
+    return celestial_body_index(records).select(name=spec.get("name_filter"), limit=limit)
+
+
+@instrumentation.traced("render.celestial_bodies")
+def render_celestial_bodies(records, image_width=500, image_height=500):
+    srcs = thumbnails.sources([r.image_url for r in records], image_width, image_height)
+    for celestial_bodies in records:
+        name = celestial_bodies.name
+        description = celestial_bodies.description
+        diameter = celestial_bodies.diameter
+        mass = celestial_bodies.mass
+        gravity = celestial_bodies.gravity
+        image = srcs.get(celestial_bodies.image_url)
+        st.markdown(
+            f"""
+            <div style="text-align: center;">
+            <img src="{image}" alt="{name}" width="{image_width}" height="{image_height}" style="object-fit: cover;">
+            <h3> Celestial Body: {name} </h3>
+            <p> Description: {description} </p>
+            <p> Diameter: {diameter} km </p>
+            <p> Mass: {mass} kg </p>
+            <p> Gravity: {gravity} m/s² </p>
+            <hr>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
 
 def sd_CelestialBodies(limit=5, image_width=500, image_height=500, display=True, name_filter=""):
-    # Fetch a larger limit to allow for filtering (adjust if API allows more)
-    fetch_limit = max(limit, 100)  # Fetch at least 100 for better filtering, but respect the user's limit
-    url = f"https://lldev.thespacedevs.com/2.3.0/celestial_bodies/?mode=detailed&limit={fetch_limit}"
-    response = requests.get(url)
-    if response.status_code != 200:
+    try:
+        params, residual = queries.build_query("celestial_bodies", {"name_filter": name_filter}, mirror.enabled())
+        records = fetch_celestial_bodies(params, limit, celestial_body_matcher(residual))
+    except APIError:
         st.error("Failed to fetch celestial bodies.")
         return []
-    data = response.json()
-    results = data["results"]
-    
-    # Filter results based on name filter
-    filtered_results = []
-    for celestial_bodies in results:
-        name = celestial_bodies["name"]
-        
-        if not name_filter or name_filter.lower() in name.lower():
-            filtered_results.append(celestial_bodies)
-    
-    # Limit the filtered results to the requested limit
-    filtered_results = filtered_results[:limit]
-    
-    celestial_bodies_images = []
-    
+    filtered = filter_celestial_bodies(records, residual, limit)
     if display:
-        for celestial_bodies in filtered_results:
-            name = celestial_bodies["name"]
-            description = celestial_bodies["description"]
-            diameter = celestial_bodies["diameter"]
-            mass = celestial_bodies["mass"]
-            gravity = celestial_bodies["gravity"]
-            image = celestial_bodies.get("image", {}).get("image_url")
-            if image:
-                celestial_bodies_images.append((name, image))
-            st.markdown(
-                f"""
-                <div style="text-align: center;">
-                <img src="{image}" alt="{name}" width="{image_width}" height="{image_height}" style="object-fit: cover;">
-                <h3> Celestial Body: {name} </h3>
-                <p> Description: {description} </p>
-                <p> Diameter: {diameter} km </p>
-                <p> Mass: {mass} kg </p>
-                <p> Gravity: {gravity} m/s² </p>
+        render_celestial_bodies(paged(filtered, "sd_celestial_bodies"), image_width, image_height)
+    return collect_images(filtered)
+
+
+# ========================================
+# ASTRONAUTS
+# ========================================
+@instrumentation.traced("fetch.astronauts")
+def fetch_astronauts(params=None, want=None, predicate=None, use_cache=True):
+    """All astronauts, or just enough pages for `want` records matching `predicate`.
+
+    `params` are extra API query parameters, e.g. from queries.build_query().
+    """
+    if mirror.enabled():
+        return mirror.fetch("astronauts", params, want, predicate, records.Astronaut.from_api)
+    return api_client.fetch_all(
+        "/2.3.0/astronauts/", params, want=want, predicate=predicate, use_cache=use_cache,
+        parse=records.Astronaut.from_api,
+    )
+
+
+def astronaut_matcher(spec):
+    agency_filter = spec.get("agency_filter")
+    nationality_filter = spec.get("nationality_filter")
+    min_flights = spec.get("min_flights")
+    max_flights = spec.get("max_flights")
+
+    def matches(astro):
+        f_launch = astro.flights_count
+        return (agency_filter is None or astro.agency == agency_filter) and \
+               (nationality_filter is None or astro.nationality == nationality_filter) and \
+               (min_flights is None or f_launch >= min_flights) and \
+               (max_flights is None or f_launch <= max_flights)
+    return matches
+
+
+def astronaut_index(records):
+    return indexes.index_for("astronauts", records, {
+        "agency": lambda a: a.agency,
+        "nationality": lambda a: a.nationality,
+    })
+
+
+@instrumentation.traced("filter.astronauts")
+def filter_astronauts(records, spec, limit=None):
+    # Same predicate as astronaut_matcher, evaluated as a vectorized mask
+    mask = columnar.astronaut_columns(records).mask(
+        agency=spec.get("agency_filter"),
+        nationality=spec.get("nationality_filter"),
+        min_flights=spec.get("min_flights"),
+        max_flights=spec.get("max_flights"),
+    )
+    return columnar.select(records, mask, limit)
+
+
+def _or_default(value, default="Unknown"):
+    """`value`, or what cards show in place of a field the API left empty."""
+    return default if value is None else value
+
+
+def _format_date(value, fmt):
+    try:
+        # Parse the ISO format (replace 'Z' with '+00:00' for UTC)
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime(fmt)
+    except (AttributeError, ValueError):
+        # If parsing fails, keep the original value
+        return value
+
+
+@instrumentation.traced("render.astronauts")
+def render_astronauts(records, image_width=400, image_height=600):
+    srcs = thumbnails.sources([r.image_url for r in records], image_width, image_height)
+    for astro in records:
+        name = astro.name
+        agency = astro.agency
+        nationality_name = astro.nationality
+        image = srcs.get(astro.image_url)
+        age = _or_default(astro.age)
+        bday = _or_default(astro.date_of_birth)
+        f_launch = astro.flights_count
+        l_flight = _or_default(astro.last_flight)
+
+        if l_flight != "Unknown":
+            # Format to a readable string (e.g., "July 21, 1969 at 05:54 PM")
+            l_flight = _format_date(l_flight, "%B %d, %Y at %I:%M %p")
+        if bday != "Unknown":
+            # Format to a readable string (e.g., "July 21, 1969")
+            bday = _format_date(bday, "%B %d, %Y")
+
+        st.markdown(
+            f"""
+            <div style="text-align: center;">
+                <img src="{image}" width="{image_width}" height="{image_height}">
+                <h3>{name}</h3>
+                <p><b>Age:</b> {age}</p>
+                <p><b>Date of Birth:</b> {bday}</p>
+                <p><b>Nationality: </b>{nationality_name}</p>
+                <p><b>Agency:</b> {agency}</p>
+                <p><b>Total Launches:</b> {f_launch}</p>
+                <p><b>Last Flight:</b> {l_flight}</p>
                 <hr>
-                </div>
-                """, 
-                unsafe_allow_html=True
-            )
-    else:
-        for celestial_bodies in filtered_results:
-            name = celestial_bodies["name"]
-            image = celestial_bodies.get("image", {}).get("image_url")
-            if image:
-                celestial_bodies_images.append((name, image))
-    
-    return celestial_bodies_images
-          
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+
 def sd_Astronauts(limit=5, image_width=400, image_height=600, display=True, agency_filter=None, nationality_filter=None, min_flights=None, max_flights=None):
-    # Fetch a larger limit to allow for filtering (adjust if API allows more)
-    fetch_limit = max(limit, 100)  # Fetch at least 100 for better filtering, but respect the user's limit
-    url = f"https://lldev.thespacedevs.com/2.3.0/astronauts?limit={fetch_limit}"
-    response = requests.get(url)
-    if response.status_code != 200:
+    spec = {
+        "agency_filter": agency_filter,
+        "nationality_filter": nationality_filter,
+        "min_flights": min_flights,
+        "max_flights": max_flights,
+    }
+    params, residual = queries.build_query("astronauts", spec, mirror.enabled())
+    try:
+        records = fetch_astronauts(params, limit, astronaut_matcher(residual))
+    except APIError:
         st.error("Failed to fetch astronauts.")
         return [], []
-    data = response.json()
-    results = data["results"]
-    
-    # Filter results based on provided filters
-    filtered_results = []
-    for astro in results:
-        agency = astro.get("agency", {}).get("name", "Unknown")
-        nationality = astro["nationality"]
-        nationality_name = nationality[0]['nationality_name'] if nationality else "Unknown"
-        f_launch = astro.get("flights_count", 0)  # Assume it's an int, default to 0 if missing
-        
-        if (agency_filter is None or agency == agency_filter) and \
-           (nationality_filter is None or nationality_name == nationality_filter) and \
-           (min_flights is None or f_launch >= min_flights) and \
-           (max_flights is None or f_launch <= max_flights):
-            filtered_results.append(astro)
-    
-    # Limit the filtered results to the requested limit
-    filtered_results = filtered_results[:limit]
-    
-    astronaut_images = []
-    
+    filtered = filter_astronauts(records, residual, limit)
     if display:
-        for astro in filtered_results:
-            name = astro["name"]
-            nationality = astro["nationality"]
-            agency = astro.get("agency", {}).get("name", "Unknown")
-            nationality_name = nationality[0]['nationality_name'] if nationality else "Unknown"
-            image = astro.get("image", {}).get("image_url")
-            age = astro.get("age", "Unknown")
-            bday = astro.get("date_of_birth", "Unknown")
-            f_launch = astro.get("flights_count", "Unknown")
-            l_flight = astro.get("last_flight", "Unknown")
-            
-            if l_flight != "Unknown":
-                try:
-                    # Parse the ISO format (replace 'Z' with '+00:00' for UTC)
-                    dt = datetime.fromisoformat(l_flight.replace('Z', '+00:00')) #if l_flight else None
-                    # Format to a readable string (e.g., "July 21, 1969 at 05:54 PM")
-                    l_flight = dt.strftime("%B %d, %Y at %I:%M %p")
-                except ValueError:
-                    # If parsing fails, keep the original value
-                    pass
-                finally:
-                    if l_flight is None:
-                        l_flight = "Unknown"
-
-            if bday != "Unknown":
-                try:
-                    # Parse the ISO format (replace 'Z' with '+00:00' for UTC if present)
-                    dt = datetime.fromisoformat(bday.replace('Z', '+00:00'))
-                    # Format to a readable string (e.g., "July 21, 1969")
-                    bday = dt.strftime("%B %d, %Y")
-                except ValueError:
-                    # If parsing fails, keep the original value
-                    pass
-            if image:
-                astronaut_images.append((name, image))
+        render_astronauts(paged(filtered, "sd_astronauts"), image_width, image_height)
+    return collect_images(filtered), filtered
+
+
+# ========================================
+# SPACECRAFT
+# ========================================
+@instrumentation.traced("fetch.spacecraft")
+def fetch_spacecraft(params=None, want=None, predicate=None, use_cache=True):
+    """All spacecraft, or just enough pages for `want` records matching `predicate`.
+
+    `params` are extra API query parameters, e.g. from queries.build_query().
+    """
+    if mirror.enabled():
+        return mirror.fetch("spacecraft", params, want, predicate, records.Spacecraft.from_api)
+    return api_client.fetch_all(
+        "/2.3.0/spacecraft/", {"mode": "detailed", **(params or {})}, want=want, predicate=predicate, use_cache=use_cache,
+        parse=records.Spacecraft.from_api,
+    )
+
+
+def spacecraft_matcher(spec):
+    in_space_filter = spec.get("in_space_filter")
+    status_filter = spec.get("status_filter")
+    return lambda spacecraft: (in_space_filter is None or spacecraft.in_space == in_space_filter) and \
+                              (status_filter is None or spacecraft.status == status_filter)
+
+
+def spacecraft_index(records):
+    return indexes.index_for("spacecraft", records, {
+        "status": lambda s: s.status,
+        "in_space": lambda s: s.in_space,
+    })
+
+
+@instrumentation.traced("filter.spacecraft")
+def filter_spacecraft(records, spec, limit=None):
+    return spacecraft_index(records).select({
+        "status": spec.get("status_filter"),
+        "in_space": spec.get("in_space_filter"),
+    }, limit=limit)
+
+
+@instrumentation.traced("render.spacecraft")
+def render_spacecraft(records, image_width=600, image_height=800):
+    srcs = thumbnails.sources([r.image_url for r in records], image_width, image_height)
+    for spacecraft in records:
+        name = spacecraft.name
+        description = _or_default(spacecraft.description, "No description provided.")
+        in_space = spacecraft.in_space
+        status = spacecraft.status
+        image = srcs.get(spacecraft.image_url)
+
+        if image:
             st.markdown(
                 f"""
-                <div style="text-align: center;">
-                    <img src="{image}" width="{image_width}" height="{image_height}">
-                    <h3>{name}</h3>
-                    <p><b>Age:</b> {age}</p>
-                    <p><b>Date of Birth:</b> {bday}</p>
-                    <p><b>Nationality: </b>{nationality_name}</p>
-                    <p><b>Agency:</b> {agency}</p>
-                    <p><b>Total Launches:</b> {f_launch}</p>
-                    <p><b>Last Flight:</b> {l_flight}</p>
+                <div style="text-align: center; margin: 3px; padding: 3px;">
+                    <img src="{image}" alt="{name}" style="object-fit:cover;" width="{image_width}" height="{image_height}">
+                    <h3>Spacecraft: {name}</h3>
+                    <p><b>Status:</b> {status}</p>
+                    <p><b>In Space:</b> {in_space}</p>
+                    <p>{description}</p>
                     <hr>
                 </div>
                 """,
                 unsafe_allow_html=True
             )
-    else:
-        for astro in filtered_results:
-            name = astro["name"]
-            image = astro.get("image", {}).get("image_url")
-            if image:
-                astronaut_images.append((name, image))
-    
-    return astronaut_images, filtered_results
-                 
-def sd_Spacecraft(limit=5, image_width=600, image_height=800, display=True, in_space_filter=None, status_filter=None):
-    fetch_limit = max(limit, 100)
-    url = f"https://lldev.thespacedevs.com/2.3.0/spacecraft/?mode=detailed&limit={fetch_limit}"
-    response = requests.get(url)
+        else:
+            st.write(f"No image available for {name}")
 
-    if response.status_code != 200:
+
+def sd_Spacecraft(limit=5, image_width=600, image_height=800, display=True, in_space_filter=None, status_filter=None):
+    spec = {"in_space_filter": in_space_filter, "status_filter": status_filter}
+    params, residual = queries.build_query("spacecraft", spec, mirror.enabled())
+    try:
+        records = fetch_spacecraft(params, limit, spacecraft_matcher(residual))
+    except APIError:
         st.error("Failed to fetch spacecraft.")
         return []
+    filtered = filter_spacecraft(records, residual, limit)
+    if display:
+        render_spacecraft(paged(filtered, "sd_spacecraft"), image_width, image_height)
+    return collect_images(filtered)
 
-    data = response.json()
-    results = data["results"]
-
-    # Apply filters
-    filtered_results = []
-    for spacecraft in results:
-
-        in_space = spacecraft.get("in_space", None)
-        status = spacecraft.get("status", {}).get("name", "Unknown")
-
-        if (in_space_filter is None or in_space == in_space_filter) and \
-           (status_filter is None or status == status_filter):
-
-            filtered_results.append(spacecraft)
 
-    filtered_results = filtered_results[:limit]
+# ========================================
+# LAUNCHERS
+# ========================================
+@instrumentation.traced("fetch.launchers")
+def fetch_launchers(params=None, want=None, predicate=None, use_cache=True):
+    """All launchers, or just enough pages for `want` records matching `predicate`.
 
-    spacecraft_image_urls = []
+    `params` are extra API query parameters, e.g. from queries.build_query().
+    """
+    if mirror.enabled():
+        return mirror.fetch("launchers", params, want, predicate, records.Launcher.from_api)
+    return api_client.fetch_all(
+        "/2.3.0/launchers/", {"mode": "detailed", **(params or {})}, want=want, predicate=predicate, use_cache=use_cache,
+        parse=records.Launcher.from_api,
+    )
+
+
+def launcher_matcher(spec):
+    """Supports filters: status, flight_proven (bool), attempted_landings (int), successful_landings (int)."""
+    status_filter = spec.get("status_filter")
+    flight_proven_filter = spec.get("flight_proven_filter")
+    attempted_landings_filter = spec.get("attempted_landings_filter")
+    successful_landings_filter = spec.get("successful_landings_filter")
+
+    def matches(launcher):
+        return (status_filter is None or launcher.status == status_filter) and \
+               (flight_proven_filter is None or launcher.flight_proven == flight_proven_filter) and \
+               (attempted_landings_filter is None or launcher.attempted_landings == attempted_landings_filter) and \
+               (successful_landings_filter is None or launcher.successful_landings == successful_landings_filter)
+    return matches
+
+
+def launcher_index(records):
+    return indexes.index_for("launchers", records, {
+        "status": lambda l: l.status,
+        "flight_proven": lambda l: l.flight_proven,
+        "attempted_landings": lambda l: l.attempted_landings,
+        "successful_landings": lambda l: l.successful_landings,
+    })
+
+
+@instrumentation.traced("filter.launchers")
+def filter_launchers(records, spec, limit=None):
+    return launcher_index(records).select({
+        "status": spec.get("status_filter"),
+        "flight_proven": spec.get("flight_proven_filter"),
+        "attempted_landings": spec.get("attempted_landings_filter"),
+        "successful_landings": spec.get("successful_landings_filter"),
+    }, limit=limit)
+
+
+@instrumentation.traced("render.launchers")
+def render_launchers(records, image_width=300, image_height=300):
+    srcs = thumbnails.sources([r.image_url for r in records], image_width, image_height)
+    for launcher in records:
+        name = launcher.name
+        serial_number = _or_default(launcher.serial_number, "N/A")
+        details = _or_default(launcher.details, "No details provided.")
+        status = launcher.status
+        flights = _or_default(launcher.flights, 0)
+        flight_proven = _or_default(launcher.flight_proven, False)
+        attempted_landings = _or_default(launcher.attempted_landings, 0)
+        successful_landings = _or_default(launcher.successful_landings, 0)
+        image = srcs.get(launcher.image_url)
+
+        # Always display the card even if image is missing (shows N/A)
+        img_tag = f'<img src="{image}" alt="{name}" style="display:block; margin: 0 auto; object-fit:cover;" width="{image_width}" height="{image_height}">' if image else ''
+        st.markdown(
+            f"""
+            <div style="text-align: center; padding: 8px;">
+                {img_tag}
+                <h3>Launcher Name: {name}</h3>
+                <p><b>Serial Number:</b> {serial_number}</p>
+                <p><b>Status:</b> {status}</p>
+                <p><b>Details:</b> {details}</p>
+                <p><b>Flights:</b> {flights}</p>
+                <p><b>Flight Proven:</b> {flight_proven}</p>
+                <p><b>Attempted Landings:</b> {attempted_landings}</p>
+                <p><b>Successful Landings:</b> {successful_landings}</p>
+                <hr>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
-    # Display results
-    if display:
-        for spacecraft in filtered_results:
-            name = spacecraft.get("name", "Unknown")
-            description = spacecraft.get("description", "No description provided.")
-            in_space = spacecraft.get("in_space", None)
-            status = spacecraft.get("status", {}).get("name", "Unknown")
-            image = spacecraft.get("image", {}).get("image_url") if spacecraft.get("image") else None
-
-            if image:
-                spacecraft_image_urls.append((name, image))
-
-                st.markdown(
-                    f"""
-                    <div style="text-align: center; margin: 3px; padding: 3px;">
-                        <img src="{image}" alt="{name}" style="object-fit:cover;" width="{image_width}" height="{image_height}">
-                        <h3>Spacecraft: {name}</h3>
-                        <p><b>Status:</b> {status}</p>
-                        <p><b>In Space:</b> {in_space}</p>
-                        <p>{description}</p>
-                        <hr>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-            else:
-                st.write(f"No image available for {name}")
 
-    else:
-        for spacecraft in filtered_results:
-            name = spacecraft.get("name", "Unknown")
-            image = spacecraft.get("image", {}).get("image_url") if spacecraft.get("image") else None
-            if image:
-                spacecraft_image_urls.append((name, image))
-
-    return spacecraft_image_urls
-              
 def sd_Launchers(
     limit=5,
     image_width=300,
@@ -235,147 +441,198 @@ def sd_Launchers(
 ):
     """
     Fetch and optionally display launchers. Returns a list of (name, image_url) tuples
-    when display=False so the caller can build a zip for downloading.
-    Supports filters: status, flight_proven (bool), attempted_landings (int), successful_landings (int).
+    so the caller can build a zip for downloading.
     """
-
-    # Fetch more items to allow filtering before truncation
-    fetch_limit = max(limit * 3, 100)
-    url = f"https://lldev.thespacedevs.com/2.3.0/launchers/?mode=detailed&limit={fetch_limit}"
-    response = requests.get(url)
-
-    if response.status_code != 200:
+    spec = {
+        "status_filter": status_filter,
+        "flight_proven_filter": flight_proven_filter,
+        "attempted_landings_filter": attempted_landings_filter,
+        "successful_landings_filter": successful_landings_filter,
+    }
+    params, residual = queries.build_query("launchers", spec, mirror.enabled())
+    try:
+        records = fetch_launchers(params, limit, launcher_matcher(residual))
+    except APIError:
         st.error("Failed to fetch launchers.")
         return []
+    filtered = filter_launchers(records, residual, limit)
+    if display:
+        render_launchers(paged(filtered, "sd_launchers"), image_width, image_height)
+    return collect_images(filtered)
 
-    data = response.json()
-    results = data.get("results", [])
-
-    # Apply filters
-    filtered = []
-    for launcher in results:
-        status = launcher.get("status", {}).get("name", "Unknown")
-        flight_proven = launcher.get("flight_proven", None)
-        attempted_landings = launcher.get("attempted_landings", None)
-        successful_landings = launcher.get("successful_landings", None)
-
-        if (status_filter is None or status == status_filter) and \
-           (flight_proven_filter is None or flight_proven == flight_proven_filter) and \
-           (attempted_landings_filter is None or attempted_landings == attempted_landings_filter) and \
-           (successful_landings_filter is None or successful_landings == successful_landings_filter):
-            filtered.append(launcher)
-
-    # Trim to requested limit
-    filtered = filtered[:limit]
-
-    launcher_image_urls = []
-
-    # Helper to safely get image URL (covers a couple naming variants)
-    def _extract_image_url(obj):
-        if not obj:
-            return None
-        # API sometimes returns {"image": {"image_url": ...}} or sometimes "image_url" directly
-        if isinstance(obj, dict):
-            return obj.get("image_url") or obj.get("image_url") or (obj.get("image") and obj.get("image").get("image_url"))
-        return None
-
-    # Display or collect images
-    for launcher in filtered:
-        # Robust extraction for fields
-        # Some launcher objects use 'launcher_config' with 'full_name', others may use 'name'
-        name = launcher.get("launcher_config", {}).get("full_name") or launcher.get("name") or "Unknown"
-        serial_number = launcher.get("serial_number", "N/A")
-        details = launcher.get("details", "No details provided.")
-        status = launcher.get("status", {}).get("name", "Unknown")
-        flights = launcher.get("flights", 0)
-        flight_proven = launcher.get("flight_proven", False)
-        attempted_landings = launcher.get("attempted_landings", 0)
-        successful_landings = launcher.get("successful_landings", 0)
-
-        # Try several places for the image URL
-        image = None
-        # common shapes:
-        image = launcher.get("image", {}).get("image_url") if launcher.get("image") else None
-        if not image:
-            image = launcher.get("image_url")
-        if not image:
-            # fallback if nested differently
-            image_field = launcher.get("image")
-            if isinstance(image_field, dict):
-                image = image_field.get("image_url") or image_field.get("url")
-
-        # If still nothing, skip image collection/display but continue to show info (optional)
-        if image:
-            launcher_image_urls.append((name, image))
 
-        if display:
-            # Always display the card even if image is missing (shows N/A)
-            img_tag = f'<img src="{image}" alt="{name}" style="display:block; margin: 0 auto; object-fit:cover;" width="{image_width}" height="{image_height}">' if image else ''
-            st.markdown(
-                f"""
-                <div style="text-align: center; padding: 8px;">
-                    {img_tag}
-                    <h3>Launcher Name: {name}</h3>
-                    <p><b>Serial Number:</b> {serial_number}</p>
-                    <p><b>Status:</b> {status}</p>
-                    <p><b>Details:</b> {details}</p>
-                    <p><b>Flights:</b> {flights}</p>
-                    <p><b>Flight Proven:</b> {flight_proven}</p>
-                    <p><b>Attempted Landings:</b> {attempted_landings}</p>
-                    <p><b>Successful Landings:</b> {successful_landings}</p>
-                    <hr>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+LAUNCH_FIELDS = [
+    "launch_name", "provider", "rocket_name", "mission_name", "mission_type", "mission_description",
+    "window_start", "window_end", "pad_name", "location_name",
+]
+
 
-    return launcher_image_urls
-    
+@instrumentation.traced("transform.launch_rows")
 def rows_from_launch_results(results):
     rows = []
     for l in results:
         rows.append({
-            "launch_name": l.get("name"),
-            "provider": l.get("launch_service_provider", {}).get("name"),
-            "rocket_name": l.get("rocket", {}).get("configuration", {}).get("name"),
-            "mission_name": l.get("mission", {}).get("name"),
-            "mission_type": l.get("mission", {}).get("type"),
-            "mission_description": l.get("mission", {}).get("description"),
-            "window_start": l.get("window_start"),
-            "window_end": l.get("window_end"),
-            "pad_name": l.get("pad", {}).get("name"),
-            "location_name": l.get("pad", {}).get("location", {}).get("name"),
+            "launch_name": l.name,
+            "provider": l.provider,
+            "rocket_name": l.rocket,
+            "mission_name": l.mission_name,
+            "mission_type": l.mission_type,
+            "mission_description": l.mission_description,
+            "window_start": l.window_start,
+            "window_end": l.window_end,
+            "pad_name": l.pad,
+            "location_name": l.location,
         })
     return rows
 
-def exportLaunchData():
-    url = "https://lldev.thespacedevs.com/2.0.0/launch/"
-    response = requests.get(url)
-    data = response.json()
-    launches = data.get("results", [])
-    return rows_from_launch_results(launches)
+@instrumentation.traced("fetch.launches")
+def fetch_launches(limit=10, use_cache=True):
+    # 10 is the API's default page size
+    if mirror.enabled():
+        return mirror.fetch("launches", want=limit, parse=records.Launch.from_api)[:limit]
+    return api_client.fetch_all("/2.0.0/launch/", want=limit, use_cache=use_cache, parse=records.Launch.from_api)[:limit]
 
-def saveLaunchData(rows, file_format="csv"):
-    import pandas as pd
+def exportLaunchData():
+    return rows_from_launch_results(fetch_launches())
+
+def iter_launch_rows(start, end, on_count=None):
+    """Yield export rows for launches from `start` to `end` (dates, inclusive), a page at a time."""
+    params = {
+        "window_start__gte": f"{start.isoformat()}T00:00:00Z",
+        "window_start__lte": f"{end.isoformat()}T23:59:59Z",
+        "ordering": "window_start",
+    }
+    # Not cached: an export can span far more pages than the cache should hold
+    for results in api_client.iter_pages("/2.0.0/launch/", params, use_cache=False, on_count=on_count):
+        yield rows_from_launch_results([records.Launch.from_api(raw) for raw in results])
+
+
+@instrumentation.traced("export.launch_range")
+def stream_launch_export(start, end, file_format, out, progress=None):
+    """Write launches from `start` to `end` to the binary file `out` in one of exporters.FORMATS.
+
+    Rows are written page by page, so memory use doesn't grow with the date
+    range. `progress(rows_done, rows_total)` is called after every page;
+    rows_total is None if the API doesn't report a count. Returns the
+    number of rows written.
+    """
+    total = {}
+
+    def pages():
+        written = 0
+        for rows in iter_launch_rows(start, end, on_count=lambda count: total.setdefault("rows", count)):
+            yield rows
+            # The writer asks for the next page once this one is written
+            written += len(rows)
+            if progress:
+                progress(written, total.get("rows"))
+
+    return exporters.write(file_format, LAUNCH_FIELDS, pages(), out)
+
+
+EXPORT_DIR = os.environ.get("SPACEDEVS_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "spacedevs-exports"))
+EXPORT_FILE_TTL = float(os.environ.get("SPACEDEVS_EXPORT_FILE_TTL", 3600))  # seconds a built export is kept
+
+
+def _sweep_exports(max_age=EXPORT_FILE_TTL):
+    """Delete export files (date ranges, large ZIPs) older than `max_age`, e.g. left by sessions that went away."""
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(EXPORT_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # removed by another session
+
+
+def launch_range_export():
+    """Export controls for the full launch history between two dates."""
+    with st.expander("Export launches by date range"):
+        today = date.today()
+        dates = st.date_input("Launch dates", (date(today.year, 1, 1), today), key="range_export_dates")
+        file_format = st.selectbox("Export format", list(exporters.FORMATS), key="range_export_format")
+        if not isinstance(dates, tuple) or len(dates) != 2:
+            st.info("Pick a start and an end date.")
+            return
+        start, end = dates
+        request = (start, end, file_format)
+
+        if st.button("Build export", key="range_export_build"):
+            previous = st.session_state.pop("range_export", None)
+            if previous:
+                _remove_quietly(previous["path"])
+            bar = st.progress(0.0, text="Fetching launches...")
+
+            def progress(done, total):
+                fraction = min(done / total, 1.0) if total else 0.0
+                bar.progress(fraction, text=f"{done} of {total or '?'} launches written")
+
+            _sweep_exports()
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix="launches-", suffix=f".{file_format}", dir=EXPORT_DIR)
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    rows = stream_launch_export(start, end, file_format, out, progress)
+            except ImportError:
+                _remove_quietly(path)
+                st.error("Parquet export needs pyarrow installed.")
+                return
+            except APIError:
+                _remove_quietly(path)
+                st.error("Failed to fetch launches.")
+                return
+            bar.empty()
+            st.session_state["range_export"] = {"request": request, "path": path, "rows": rows}
+
+        built = st.session_state.get("range_export")
+        if built and built["request"] == request:
+            try:
+                f = open(built["path"], "rb")
+            except OSError:
+                # Swept after EXPORT_FILE_TTL; the user has to build it again
+                del st.session_state["range_export"]
+                st.info("That export has expired. Build it again to download it.")
+                return
+            with f:
+                st.download_button(
+                    f"Download {built['rows']} launches",
+                    data=f,
+                    file_name=f"launches_{start.isoformat()}_{end.isoformat()}.{file_format}",
+                    mime=exporters.FORMATS[file_format].mime,
+                    key="range_export_download",
+                )
 
-    df = pd.DataFrame(rows)
 
-    if file_format == "csv":
-        return df.to_csv(index=False).encode("utf-8")
-    else:
-        from io import BytesIO
-        buffer = BytesIO()
-        df.to_excel(buffer, index=False)
-        return buffer.getvalue()
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
-def sdLaunch(limit=5):
-    # Fetch from API
-    url = f"https://lldev.thespacedevs.com/2.0.0/launch/?limit={limit}"
-    response = requests.get(url)
-    data = response.json()
-    results = data.get("results", [])
 
-    rows = rows_from_launch_results(results)
+@instrumentation.traced("export.launch_data")
+def saveLaunchData(rows, file_format="csv"):
+    return exporters.encode(file_format, LAUNCH_FIELDS, rows)
+
+@instrumentation.traced("render.launches")
+def sdLaunch(limit=5, results=None):
+    # Fetch from API unless the caller already has the launches; only the
+    # first `limit` are shown, but the browser is built over the whole
+    # (shared, memoized) list so it survives slider changes
+    if results is None:
+        try:
+            results = fetch_launches(limit)
+        except APIError:
+            st.error("Failed to fetch launches.")
+            return
+
+    shown = min(limit, len(results))
+    browser = launch_browser.browser_for(results)
 
     # Tabs
     tab_all, tab_provider, tab_year = st.tabs(["All Data", "Filter by Provider", "Filter by Year"])
@@ -386,31 +643,15 @@ def sdLaunch(limit=5):
     with tab_all:
         st.subheader("All Launch Data")
 
-        for l in results:
-            name = l.get("launch_service_provider", {}).get("name")
-            rocket = l.get("rocket", {}).get("configuration", {}).get("name")
-            year = (l.get("window_start") or '')[:4]
-            mission = l.get("mission", {}).get("name")
-            desc = l.get("mission", {}).get("description")
-
-            st.markdown(f"""
-            **Provider:** {name}  
-            **Rocket:** {rocket}  
-            **Year:** {year}  
-            **Mission:** {mission}  
-
-            {desc}
-            """)
-            st.markdown("---")
+        for launch in paged(results[:shown], "launch_all"):
+            _launch_card(launch)
 
         # Export buttons
         st.subheader("Export Launch Data")
-        fmt = st.selectbox("Format", ["csv", "xlsx"])
-        st.download_button(
-            "Download Launch Data",
-            data=saveLaunchData(rows, fmt),
-            file_name=f"launch_data.{fmt}",
-            mime="text/csv" if fmt == "csv" else "application/vnd.ms-excel"
+        fmt = st.selectbox("Format", list(exporters.FORMATS))
+        export_download_button(
+            results, fmt, LAUNCH_FIELDS, rows_from_launch_results, "Download Launch Data",
+            file_name=f"launch_data.{fmt}", key="launch_data_export", limit=shown,
         )
 
     # ========================================
@@ -419,30 +660,12 @@ def sdLaunch(limit=5):
     with tab_provider:
         st.subheader("Filter Launches by Provider")
 
-        providers = sorted({
-            (l.get("launch_service_provider") or {}).get("name")
-            for l in results if l.get("launch_service_provider")
-        })
+        providers = sorted({launch.provider for launch in results[:shown]} - {None})
 
         selected = st.selectbox("Choose Provider", providers)
 
-        for l in results:
-            name = (l.get("launch_service_provider") or {}).get("name")
-            if name == selected:
-                rocket = l.get("rocket", {}).get("configuration", {}).get("name")
-                year = (l.get("window_start") or '')[:4]
-                mission = l.get("mission", {}).get("name")
-                desc = l.get("mission", {}).get("description")
-                
-                st.markdown(f"""
-                **Provider:** {name}  
-                **Rocket:** {rocket}  
-                **Year:** {year}  
-                **Mission:** {mission}  
-
-                {desc}
-                """)
-                st.markdown("---")
+        for launch in paged(browser.select(provider=selected, top=shown), "launch_provider"):
+            _launch_card(launch)
 
     # ========================================
     # TAB 3 — YEAR FILTER
@@ -450,285 +673,458 @@ def sdLaunch(limit=5):
     with tab_year:
         st.subheader("Filter Launches by Year")
 
-        year_input = st.text_input("Enter Year", "2020")
-
-        found = False
-        for launch in results:
-            date = launch.get("window_start")
-            if date and date.startswith(year_input):
-                provider = launch.get("launch_service_provider", {}).get("name")
-                rocket = launch.get("rocket", {}).get("configuration", {}).get("name")
-                mission = launch.get("mission", {}).get("name")
-                desc = launch.get("mission", {}).get("description")
-
-                st.markdown(f"""
-                **Provider:** {provider}  
-                **Rocket:** {rocket}  
-                **Year:** {year_input}  
-                **Mission:** {mission}  
-
-                {desc}
-                """)
-                st.markdown("---")
-                found = True
-
-        if not found:
+        years = sorted({int(launch.window_start[:4]) for launch in results[:shown] if launch.window_start})
+        if not years:
             st.info("No launches found for that year.")
+            return
+        first, last = st.select_slider("Years", options=years, value=(years[-1], years[-1]))
+        provider = st.selectbox("Provider", [None] + providers,
+                                format_func=lambda p: "All providers" if p is None else p, key="launch_year_provider")
+
+        matches = browser.select(provider=provider, years=(first, last), top=shown)
+        for launch in paged(matches, "launch_year"):
+            _launch_card(launch)
+
+        if not matches:
+            st.info("No launches found for those years.")
+
+def _launch_card(launch):
+    st.markdown(f"""
+    **Provider:** {launch.provider}  
+    **Rocket:** {launch.rocket}  
+    **Year:** {(launch.window_start or "")[:4]}  
+    **Mission:** {launch.mission_name}  
+
+    {launch.mission_description}
+    """)
+    st.markdown("---")
+
+ZIP_SPILL_THRESHOLD = 32 * 1024 * 1024  # bytes kept in memory before the archive spills to a temp file
+ZIP_CACHE_MAX_BYTES = int(os.environ.get("SPACEDEVS_ZIP_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+@instrumentation.traced("zip.build")
+def build_zip_from_images(image_list, spill_threshold=ZIP_SPILL_THRESHOLD):
+    """image_list must be: [(name, url), (name, url), ...]
+
+    Returns a file object positioned at the start of the archive. Entries are
+    written in input order as their downloads complete, each copied from the
+    image cache in chunks, and the archive moves from memory to a temp file
+    once it grows past `spill_threshold` bytes.
+    """
+    zip_file = tempfile.SpooledTemporaryFile(max_size=spill_threshold)
+    paths = downloader.iter_files(img_url for _, img_url in image_list)
+
+    with zipfile.ZipFile(zip_file, "w") as zipf:
+        for (name, _), path in zip(image_list, paths):
+            if path is None:
+                continue  # skip failed downloads
+            safe_name = name.replace(" ", "_")
+            try:
+                with open(path, "rb") as src, zipf.open(f"{safe_name}.jpg", "w") as dst:
+                    shutil.copyfileobj(src, dst, downloader.CHUNK_SIZE)
+            except OSError:
+                continue  # evicted from the image cache by another session
 
-def build_zip_from_images(image_list):
-    """image_list must be: [(name, url), (name, url), ...]"""
+    zip_file.seek(0)
+    return zip_file
+
+_zips = OrderedDict()  # ((name, url), ...) -> archive bytes, least recently used first
+_zip_files = {}  # ((name, url), ...) -> path in EXPORT_DIR of an archive too big for _zips
+_zips_lock = threading.Lock()
+
+
+def _zip_data(image_list):
+    """The archive for the exact ((name, url), ...) selection, shared by every session.
+
+    Built archives are kept in memory while they fit in ZIP_CACHE_MAX_BYTES
+    in total. One bigger than that is kept as a file in EXPORT_DIR instead,
+    until it has gone unused for EXPORT_FILE_TTL; its path is returned
+    rather than its bytes.
+    """
+    with _zips_lock:
+        data = _zips.get(image_list)
+        if data is not None:
+            _zips.move_to_end(image_list)
+            return data
+        path = _zip_files.get(image_list)
+    if path is not None:
+        try:
+            os.utime(path)  # keep it from the sweep while it is being used
+            return path
+        except OSError:
+            pass  # swept; build it again
+    with build_zip_from_images(image_list) as zip_file:
+        size = zip_file.seek(0, os.SEEK_END)
+        zip_file.seek(0)
+        if size <= ZIP_CACHE_MAX_BYTES:
+            data = zip_file.read()
+        else:
+            _sweep_exports()
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix="images-", suffix=".zip", dir=EXPORT_DIR)
+            with os.fdopen(fd, "wb") as out:
+                shutil.copyfileobj(zip_file, out, downloader.CHUNK_SIZE)
+            with _zips_lock:
+                for selection, old in list(_zip_files.items()):
+                    if not os.path.exists(old):
+                        del _zip_files[selection]
+                _zip_files[image_list] = path
+            return path
+    with _zips_lock:
+        _zips[image_list] = data
+        total = sum(len(d) for d in _zips.values())
+        while _zips and total > ZIP_CACHE_MAX_BYTES:
+            total -= len(_zips.popitem(last=False)[1])
+    return data
+
+def zip_download_button(image_list, label, file_name, key):
+    """Build the ZIP only once the user asks for it, then offer the download."""
+    selection = tuple(image_list)
+    prepared_key = f"{key}_prepared"
+
+    if st.session_state.get(prepared_key) != selection:
+        if not st.button(f"Prepare ZIP ({len(selection)} images)", key=f"{key}_prepare"):
+            return
+        st.session_state[prepared_key] = selection
+
+    with st.spinner("Building ZIP..."):
+        data = _zip_data(selection)
+    if isinstance(data, str):
+        with open(data, "rb") as f:
+            st.download_button(label, data=f, file_name=file_name, mime="application/zip", key=key)
+    else:
+        st.download_button(label, data=data, file_name=file_name, mime="application/zip", key=key)
+
+# ========================================
+# DATASETS
+# ========================================
+LAUNCH_PREFETCH = 100  # most launches the Launch Data slider can ask for
+
+# name -> (label for messages, loader taking use_cache)
+DATASETS = {
+    "celestial_bodies": ("celestial bodies", lambda use_cache=True: fetch_celestial_bodies(use_cache=use_cache)),
+    "astronauts": ("astronauts", lambda use_cache=True: fetch_astronauts(use_cache=use_cache)),
+    "spacecraft": ("spacecraft", lambda use_cache=True: fetch_spacecraft(use_cache=use_cache)),
+    "launchers": ("launchers", lambda use_cache=True: fetch_launchers(use_cache=use_cache)),
+    "launches": ("launches", lambda use_cache=True: fetch_launches(LAUNCH_PREFETCH, use_cache)),
+}
+
+for _name, (_, _loader) in DATASETS.items():
+    # The refresher replaces the response cache for these, so always go to the source
+    refresher.register(_name, lambda loader=_loader: loader(use_cache=False))
+# Structures derived from a snapshot go when it is replaced
+refresher.on_swap(columnar.forget)
+refresher.on_swap(indexes.forget)
+refresher.on_swap(launch_browser.forget)
+refresher.on_swap(exporters.forget)
+
+
+def _record_rows(records):
+    return [record.as_dict() for record in records]
+
+
+# name -> (export columns, records -> rows)
+EXPORTS = {
+    "celestial_bodies": (records.CelestialBody.__slots__, _record_rows),
+    "astronauts": (records.Astronaut.__slots__, _record_rows),
+    "spacecraft": (records.Spacecraft.__slots__, _record_rows),
+    "launchers": (records.Launcher.__slots__, _record_rows),
+    "launches": (LAUNCH_FIELDS, rows_from_launch_results),
+}
+
+
+def export_download_button(records, fmt, fields, to_rows, label, file_name, key, limit=None):
+    """Encode the file only once the user asks for it, then offer the download.
+
+    Encodings are shared by every session, so a file someone else already
+    prepared for this snapshot is offered straight away.
+    """
+    future = exporters.cached(records, fmt, fields, to_rows, limit)
+    if future is None:
+        if not st.button(f"Prepare {fmt} file", key=f"{key}_prepare"):
+            return
+        future = exporters.prepare(records, fmt, fields, to_rows, limit)
+    try:
+        with st.spinner(f"Building {fmt} file..."):
+            data = future.result()
+    except ImportError:
+        st.error("Parquet export needs pyarrow installed.")
+        return
+    st.download_button(label, data=data, file_name=file_name, mime=exporters.FORMATS[fmt].mime, key=key)
+
+
+def dataset_export(name, dataset):
+    """Format picker and download button for a whole dataset."""
+    if not dataset:
+        return
+    label = DATASETS[name][0]
+    fmt = st.selectbox(f"Export all {label} as", list(exporters.FORMATS), key=f"{name}_export_format")
+    fields, to_rows = EXPORTS[name]
+    export_download_button(
+        dataset, fmt, fields, to_rows, f"Download {len(dataset)} {label}",
+        file_name=f"{name}.{fmt}", key=f"{name}_export",
+    )
+
+
+def render_store_report():
+    """Sidebar summary of the shared dataset store's memory use."""
+    mb = lambda n: round(n / (1024 * 1024), 2)
+    with st.sidebar.expander("Dataset store"):
+        st.dataframe(
+            [
+                {"dataset": row["dataset"], "records": row["records"], "MB": mb(row["bytes"]),
+                 "age s": None if row["age_seconds"] is None else round(row["age_seconds"]),
+                 "version": row["version"]}
+                for row in refresher.memory_report()
+            ],
+            hide_index=True,
+        )
+        columns, index = columnar.memo_stats(), indexes.memo_stats()
+        st.caption(
+            f"Derived: {columns['entries']} column sets ({mb(columns['bytes'])} MB), "
+            f"{index['entries']} indexes ({mb(index['bytes'])} MB). Shared by all sessions."
+        )
+
+
+def load_dataset(name):
+    """Records of a whole dataset for its tab, showing how old they are.
+
+    With background refresh on this never waits on the network: it returns
+    the last snapshot, or [] (with a notice) while the first load runs.
+    """
+    label, loader = DATASETS[name]
+    if not refresher.ENABLED:
+        try:
+            return loader()
+        except APIError:
+            st.error(f"Failed to fetch {label}.")
+            return []
+
+    snapshot = refresher.snapshot(name)
+    if snapshot.records is None:
+        if snapshot.error:
+            # Retried in the background; the next rerun picks it up
+            st.error(f"Failed to fetch {label}.")
+        else:
+            st.info(f"Loading {label}...")
+            st.session_state.setdefault("_loading", set()).add(name)
+        return []
+
+    caption = f"{len(snapshot.records)} {label}, fetched {refresher.describe_age(refresher.age(snapshot))}"
+    if snapshot.refreshing:
+        caption += " (refreshing...)"
+    st.caption(caption)
+    if snapshot.error:
+        st.warning(f"Couldn't refresh {label}; showing the last data fetched.")
+    return snapshot.records
+
+
+@st.fragment(run_every=1)
+def _rerun_when_loaded():
+    """Rerun the page once every dataset that showed "Loading" has arrived."""
+    loading = st.session_state.get("_loading", set())
+    if not loading & refresher.pending():
+        loading.clear()
+        st.rerun(scope="app")
 
-    zip_buffer = BytesIO()
 
-    with zipfile.ZipFile(zip_buffer, "w") as zipf:
-        for name, img_url in image_list:
-            try:
-                img_bytes = requests.get(img_url).content
-                safe_name = name.replace(" ", "_")
-                zipf.writestr(f"{safe_name}.jpg", img_bytes)
-            except:
-                pass  # skip failed downloads
-
-    zip_buffer.seek(0)
-    return zip_buffer
-  
 def main():
     st.title("Space Data Explorer")
+    if refresher.ENABLED:
+        refresher.start()
+    show_panel = st.sidebar.toggle("Performance panel", value=instrumentation.ENABLED, key="perf_panel")
+    run = instrumentation.start_run() if show_panel else None
+    try:
+        _render_tabs()
+        if st.session_state.get("_loading"):
+            _rerun_when_loaded()
+        if refresher.ENABLED:
+            render_store_report()
+    finally:
+        if run is not None:
+            instrumentation.finish_run(run)
+            instrumentation.render_panel(run)
+
+def _render_tabs():
+    if not refresher.ENABLED:
+        # Warm every dataset at once so the tabs below only hit the cache;
+        # failures are reported by load_dataset() when the tab retries
+        fetch_engine.gather_calls(*(loader for _, loader in DATASETS.values()))
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Celestial Bodies", "Astronauts", "Spacecraft", "Launchers", "Launch Data"])
 # TAB 1 — CELESTIAL BODIES
     with tab1:
         st.subheader("Celestial Bodies Data")
-        
+
         # Filter input
         name_filter = st.text_input("Filter by Name (partial match, case-insensitive)", "")
-        
+
         limit = st.slider("Number of Celestial Bodies to Display", min_value=1, max_value=100, value=5)
-        
-        # Get celestial_bodies_images without displaying
-        celestial_bodies_images = sd_CelestialBodies(limit=limit, display=False, name_filter=name_filter)
-        
+
+        celestial_bodies = load_dataset("celestial_bodies")
+        filtered = filter_celestial_bodies(celestial_bodies, {"name_filter": name_filter}, limit)
+        celestial_bodies_images = collect_images(filtered)
+
         # Display the download button below the slider
         if celestial_bodies_images:
-            zip_buffer = build_zip_from_images(celestial_bodies_images)
-            st.download_button(
+            zip_download_button(
+                celestial_bodies_images,
                 "Download All Celestial Bodies Images as ZIP",
-                data=zip_buffer,
                 file_name="celestial_bodies_images.zip",
-                mime="application/zip",
-                key="celestial_download"  # Unique key to avoid ID conflict
+                key="celestial_download"
             )
         else:
             st.info("No celestial body images available for download.")
-        
+
+        dataset_export("celestial_bodies", celestial_bodies)
+
         # Now display the celestial bodies
-        sd_CelestialBodies(limit=limit, display=True, name_filter=name_filter)
-    
+        render_celestial_bodies(paged(filtered, "celestial_bodies"))
+
 # TAB 2 — ASTRONAUTS
-    # TAB 2 — ASTRONAUTS
     with tab2:
         st.subheader("Astronauts Data")
-        
-        # First, fetch a larger set of data to populate filter options
-        _, astronauts_data = sd_Astronauts(limit=100, display=False)
-        
-        # Extract unique agencies and nationalities for filters
-        agencies = sorted(set([a.get("agency", {}).get("name", "Unknown") for a in astronauts_data if a.get("agency", {}).get("name", "Unknown") != "Unknown"]))
-        nationalities = sorted(set([a["nationality"][0]['nationality_name'] if a.get("nationality") else "Unknown" for a in astronauts_data if (a.get("nationality") and a["nationality"][0]['nationality_name'] != "Unknown")]))
-        
+
+        astronauts = load_dataset("astronauts")
+
+        # Agencies and nationalities for filters, with record counts
+        index = astronaut_index(astronauts)
+        agencies = index.facets["agency"]
+        nationalities = index.facets["nationality"]
+
         # Filter inputs
-        agency_filter = st.selectbox("Filter by Agency", ["All"] + agencies)
-        nationality_filter = st.selectbox("Filter by Nationality", ["All"] + nationalities)
+        agency_filter = st.selectbox("Filter by Agency", ["All"] + agencies.values(exclude={"Unknown"}),
+                                     format_func=_with_count(agencies))
+        nationality_filter = st.selectbox("Filter by Nationality", ["All"] + nationalities.values(exclude={"Unknown"}),
+                                          format_func=_with_count(nationalities))
         min_flights = st.number_input("Min Total Flights", min_value=0, value=0, step=1)
         max_flights = st.number_input("Max Total Flights", min_value=0, value=100, step=1)
-        
+
         limit = st.slider("Number of Astronauts to Display", min_value=1, max_value=100, value=5)
-        
+
         # Convert "All" to None for filtering
-        agency_filter = None if agency_filter == "All" else agency_filter
-        nationality_filter = None if nationality_filter == "All" else nationality_filter
-        
-        # Get filtered astronaut images and data
-        astronaut_images, _ = sd_Astronauts(
-            limit=limit, 
-            display=False, 
-            agency_filter=agency_filter, 
-            nationality_filter=nationality_filter, 
-            min_flights=min_flights, 
-            max_flights=max_flights
-        )
-        
+        spec = {
+            "agency_filter": None if agency_filter == "All" else agency_filter,
+            "nationality_filter": None if nationality_filter == "All" else nationality_filter,
+            "min_flights": min_flights,
+            "max_flights": max_flights,
+        }
+        filtered = filter_astronauts(astronauts, spec, limit)
+        astronaut_images = collect_images(filtered)
+
         # Display the download button
         if astronaut_images:
-            zip_buffer = build_zip_from_images(astronaut_images)
-            st.download_button(
+            zip_download_button(
+                astronaut_images,
                 "Download All Astronaut Images as ZIP",
-                data=zip_buffer,
                 file_name="astronaut_images.zip",
-                mime="application/zip",
-                key="astronaut_download"  # Unique key to avoid ID conflict
+                key="astronaut_download"
             )
         else:
             st.info("No astronaut images available for download.")
-        
-        # Now display the filtered astronauts
-        sd_Astronauts(
-            limit=limit, 
-            display=True, 
-            agency_filter=agency_filter, 
-            nationality_filter=nationality_filter, 
-            min_flights=min_flights, 
-            max_flights=max_flights
-        )
-               
-# TAB 3 — SPACECRAFT 
-    with tab3:
-        st.subheader("Spacecraft Data")
-
-        # Fetch data for filters
-        fetch_limit = 100
-        url = f"https://lldev.thespacedevs.com/2.3.0/spacecraft/?mode=detailed&limit={fetch_limit}"
-        response = requests.get(url)
 
-        if response.status_code == 200:
-            data = response.json()
-            results = data["results"]
+        dataset_export("astronauts", astronauts)
 
-            statuses = sorted(set(
-                s.get("status", {}).get("name", "Unknown")
-                for s in results
-                if s.get("status")
-            ))
+        # Now display the filtered astronauts
+        render_astronauts(paged(filtered, "astronauts"))
 
-            in_space_values = ["True", "False"]
+# TAB 3 — SPACECRAFT
+    with tab3:
+        st.subheader("Spacecraft Data")
 
-        else:
-            statuses = []
-            in_space_values = []
+        spacecraft = load_dataset("spacecraft")
+        in_space_values = [True, False] if spacecraft else []
+        index = spacecraft_index(spacecraft)
+        statuses = index.facets["status"]
 
         # Filters
-        status_filter = st.selectbox("Filter by Status", ["All"] + statuses)
-        in_space_filter = st.selectbox("Filter by In Space", ["All"] + in_space_values)
+        status_filter = st.selectbox("Filter by Status", ["All"] + statuses.values(), key="spacecraft_status",
+                                     format_func=_with_count(statuses))
+        in_space_filter = st.selectbox("Filter by In Space", ["All"] + in_space_values,
+                                       format_func=_with_count(index.facets["in_space"]))
 
         limit = st.slider("Number of Spacecraft to Display", 1, 100, 5)
 
         # Convert text to actual filter values
-        status_filter = None if status_filter == "All" else status_filter
-        in_space_filter = (
-            None if in_space_filter == "All" else
-            (True if in_space_filter == "True" else False)
-        )
-
-        # Fetch images
-        spacecraft_images = sd_Spacecraft(
-            limit=limit,
-            display=False,
-            in_space_filter=in_space_filter,
-            status_filter=status_filter
-        )
+        spec = {
+            "status_filter": None if status_filter == "All" else status_filter,
+            "in_space_filter": None if in_space_filter == "All" else in_space_filter,
+        }
+        filtered = filter_spacecraft(spacecraft, spec, limit)
+        spacecraft_images = collect_images(filtered)
 
         # Download ZIP
         if spacecraft_images:
-            zip_buffer = build_zip_from_images(spacecraft_images)
-            st.download_button(
+            zip_download_button(
+                spacecraft_images,
                 "Download All Spacecraft Images as ZIP",
-                data=zip_buffer,
                 file_name="spacecraft_images.zip",
-                mime="application/zip",
                 key="spacecraft_download"
             )
         else:
             st.info("No spacecraft images available for the selected filters.")
 
-        # Display spacecraft
-        sd_Spacecraft(
-            limit=limit,
-            display=True,
-            in_space_filter=in_space_filter,
-            status_filter=status_filter
-        )
+        dataset_export("spacecraft", spacecraft)
 
+        # Display spacecraft
+        render_spacecraft(paged(filtered, "spacecraft"))
 
 # TAB 4 — LAUNCHERS
     with tab4:
         st.subheader("Launchers Data")
 
-        # --- Fetch data for filter options ---
-        fetch_url = "https://lldev.thespacedevs.com/2.3.0/launchers/?mode=detailed&limit=200"
-        fetch_response = requests.get(fetch_url)
-
-        if fetch_response.status_code == 200:
-            data = fetch_response.json()
-            all_launchers = data["results"]
-
-            statuses = sorted(set(
-                l.get("status", {}).get("name", "Unknown")
-                for l in all_launchers
-            ))
+        # --- Fetch data once, used for filter options and results ---
+        launchers = load_dataset("launchers")
 
-            flight_proven_values = ["True", "False"]
-            attempted_list = sorted(set(l.get("attempted_landings", 0) for l in all_launchers))
-            successful_list = sorted(set(l.get("successful_landings", 0) for l in all_launchers))
-
-        else:
-            statuses = []
-            flight_proven_values = []
-            attempted_list = []
-            successful_list = []
+        index = launcher_index(launchers)
+        statuses = index.facets["status"]
+        attempted = index.facets["attempted_landings"]
+        successful = index.facets["successful_landings"]
 
         # --- UI FILTERS ---
-        status_filter = st.selectbox("Filter by Status", ["All"] + statuses)
-        flight_proven_filter = st.selectbox("Filter by Flight Proven", ["All", "True", "False"])
-        attempted_landings_filter = st.selectbox("Filter by Attempted Landings", ["All"] + list(map(str, attempted_list)))
-        successful_landings_filter = st.selectbox("Filter by Successful Landings", ["All"] + list(map(str, successful_list)))
-
-        # Convert filters
-        status_filter = None if status_filter == "All" else status_filter
-        flight_proven_filter = None if flight_proven_filter == "All" else (flight_proven_filter == "True")
-        attempted_landings_filter = None if attempted_landings_filter == "All" else int(attempted_landings_filter)
-        successful_landings_filter = None if successful_landings_filter == "All" else int(successful_landings_filter)
+        status_filter = st.selectbox("Filter by Status", ["All"] + statuses.values(), key="launcher_status",
+                                     format_func=_with_count(statuses))
+        flight_proven_filter = st.selectbox("Filter by Flight Proven", ["All", True, False],
+                                            format_func=_with_count(index.facets["flight_proven"]))
+        attempted_landings_filter = st.selectbox("Filter by Attempted Landings", ["All"] + attempted.values(),
+                                                 format_func=_with_count(attempted))
+        successful_landings_filter = st.selectbox("Filter by Successful Landings", ["All"] + successful.values(),
+                                                  format_func=_with_count(successful))
 
         # --- LIMIT SLIDER ---
         limit = st.slider("Number of Launchers to Display", min_value=1, max_value=100, value=5)
 
-        # --- FIRST CALL: FETCH IMAGES ONLY ---
-        launcher_images = sd_Launchers(
-            limit=limit,
-            display=False,
-            status_filter=status_filter,
-            flight_proven_filter=flight_proven_filter,
-            attempted_landings_filter=attempted_landings_filter,
-            successful_landings_filter=successful_landings_filter
-        )
+        # Convert filters
+        spec = {
+            "status_filter": None if status_filter == "All" else status_filter,
+            "flight_proven_filter": None if flight_proven_filter == "All" else flight_proven_filter,
+            "attempted_landings_filter": None if attempted_landings_filter == "All" else attempted_landings_filter,
+            "successful_landings_filter": None if successful_landings_filter == "All" else successful_landings_filter,
+        }
+        filtered = filter_launchers(launchers, spec, limit)
+        launcher_images = collect_images(filtered)
 
         # --- DOWNLOAD BUTTON (below slider) ---
         if launcher_images:
-            zip_buffer = build_zip_from_images(launcher_images)
-            st.download_button(
+            zip_download_button(
+                launcher_images,
                 "Download All Launcher Images as ZIP",
-                data=zip_buffer,
                 file_name="launcher_images.zip",
-                mime="application/zip",
                 key="launcher_download"
             )
         else:
             st.info("No launcher images available for download.")
 
-        # --- SECOND CALL: DISPLAY RESULTS ---
-        sd_Launchers(
-            limit=limit,
-            display=True,
-            status_filter=status_filter,
-            flight_proven_filter=flight_proven_filter,
-            attempted_landings_filter=attempted_landings_filter,
-            successful_landings_filter=successful_landings_filter
-        )
+        dataset_export("launchers", launchers)
 
+        # --- DISPLAY RESULTS ---
+        render_launchers(paged(filtered, "launchers"))
 
 # TAB 5 — LAUNCH DATA BROWSER
     with tab5:
         st.subheader("Launch Data Browser")
-        limit = st.slider("Number of Data to Display", min_value=1, max_value=100, value=5)
-        sdLaunch(limit=limit)
+        limit = st.slider("Number of Data to Display", min_value=1, max_value=LAUNCH_PREFETCH, value=5)
+        sdLaunch(limit=limit, results=load_dataset("launches"))
+        launch_range_export()
 
 def load_with_spinner(key, message, load_function, *args, **kwargs):
     st.session_state[key] = True
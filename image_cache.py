@@ -0,0 +1,225 @@
+"""Content-addressed on-disk cache for downloaded images.
+
+Each URL maps to `<sha256(url)>.bin` (the bytes) plus `<sha256(url)>.json`
+(ETag, Last-Modified and bookkeeping). Files are written to a temp file and
+moved into place with os.replace, so concurrent Streamlit sessions (threads)
+and worker processes sharing the directory never see a half-written entry.
+The total size is kept under MAX_BYTES by evicting the least recently used
+entries; a file's mtime doubles as its last-access time. Each process keeps
+a running total of the bytes it knows about, so the directory is only
+walked when that total goes over the limit.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+CACHE_DIR = os.environ.get(
+    "SPACEDEVS_IMAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "images"),
+)
+MAX_BYTES = int(os.environ.get("SPACEDEVS_IMAGE_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+FRESH_FOR = float(os.environ.get("SPACEDEVS_IMAGE_CACHE_FRESH_FOR", 24 * 3600))  # seconds before revalidating
+
+_evict_lock = threading.Lock()
+_total_lock = threading.Lock()
+_total_bytes = None  # running size of the cache; None until the first walk
+
+
+def _key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _paths(url):
+    key = _key(url)
+    directory = os.path.join(CACHE_DIR, key[:2])
+    return os.path.join(directory, key + ".bin"), os.path.join(directory, key + ".json")
+
+
+def _atomic_write(path, chunks):
+    """Write `chunks` to a temp file beside `path`, then move it into place."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+def lookup(url):
+    """Return the metadata dict for a cached URL, or None on a miss."""
+    bin_path, meta_path = _paths(url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(bin_path):
+        return None
+    return meta
+
+
+def is_fresh(meta):
+    return time.time() - meta.get("validated_at", 0) < FRESH_FOR
+
+
+def validators(meta):
+    """Conditional request headers for revalidating a cached entry."""
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def path_for(url):
+    return _paths(url)[0]
+
+
+def read(url):
+    """Return the cached bytes for `url` (marking it recently used), or None."""
+    bin_path, _ = _paths(url)
+    try:
+        with open(bin_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    _touch(bin_path)
+    return data
+
+
+def touch(url):
+    """Mark the entry for `url` recently used and return its path.
+
+    For callers that open path_for(url) themselves instead of using read().
+    """
+    bin_path = path_for(url)
+    _touch(bin_path)
+    return bin_path
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _meta_from_headers(url, headers, size):
+    return {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "size": size,
+        "validated_at": time.time(),
+    }
+
+
+def store_stream(url, chunks, headers):
+    """Write an iterable of byte chunks to the cache for `url` and return its path.
+
+    Chunks go straight to a temp file, so the body is never held in memory.
+    """
+    bin_path, meta_path = _paths(url)
+    try:
+        replaced = os.path.getsize(bin_path)
+    except OSError:
+        replaced = 0
+    size = _atomic_write(bin_path, chunks)
+    _atomic_write(meta_path, [json.dumps(_meta_from_headers(url, headers, size)).encode("utf-8")])
+    _grew(size - replaced)
+    return bin_path
+
+
+def _grew(delta):
+    """Add `delta` bytes to the running total and evict once it passes MAX_BYTES."""
+    global _total_bytes
+    with _total_lock:
+        if _total_bytes is not None:
+            _total_bytes += delta
+            if _total_bytes <= MAX_BYTES:
+                return
+    # First store in this process, or over the limit: walk the directory
+    evict()
+
+
+def store(url, data, headers):
+    """Cache `data` for `url` along with the response's validators."""
+    return store_stream(url, [data], headers)
+
+
+def mark_revalidated(url, meta, headers):
+    """Record a 304 response: keep the bytes, refresh validators and timestamps."""
+    bin_path, meta_path = _paths(url)
+    meta = dict(meta)
+    meta["validated_at"] = time.time()
+    if headers.get("ETag"):
+        meta["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        meta["last_modified"] = headers["Last-Modified"]
+    _atomic_write(meta_path, [json.dumps(meta).encode("utf-8")])
+    _touch(bin_path)
+
+
+def _entries():
+    entries = []
+    if not os.path.isdir(CACHE_DIR):
+        return entries
+    for sub in os.listdir(CACHE_DIR):
+        directory = os.path.join(CACHE_DIR, sub)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if not name.endswith(".bin"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # removed by another session
+            entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+def evict(max_bytes=None):
+    """Delete least recently used entries until the cache fits in `max_bytes`.
+
+    Also resets the running total from what is actually on disk, which
+    picks up entries written by other processes.
+    """
+    global _total_bytes
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = _entries()
+        total = sum(size for _, size, _ in entries)
+        if total > max_bytes:
+            for _, size, path in sorted(entries):
+                for victim in (path, path[:-len(".bin")] + ".json"):
+                    try:
+                        os.remove(victim)
+                    except OSError:
+                        pass
+                total -= size
+                if total <= max_bytes:
+                    break
+        with _total_lock:
+            _total_bytes = total
+
+
+def stats():
+    entries = _entries()
+    return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": MAX_BYTES}
@@ -0,0 +1,106 @@
+"""Import-time budget for the dashboard's cold start.
+
+Imports a module (functions by default, which is what Dashboard.py pulls
+in) in fresh interpreters under `python -X importtime`, and reports what
+each top-level package costs: its own load time and the time of
+everything first imported through it. The median of --repeat runs is
+used to smooth out disk and CPU noise.
+
+Exits with status 1 if the total goes over --budget-ms or if any package
+listed in --forbid (heavy libraries the app must only load on demand)
+was imported at all, so it can run as a CI check:
+
+    python import_budget.py --budget-ms 800
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+FORBIDDEN = ["matplotlib", "IPython", "pandas", "pyarrow", "PIL"]
+
+
+def measure(module):
+    """{dotted module: (self µs, cumulative µs)} for one fresh import of `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Indentation gives the nesting; the name itself has no spaces
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def by_package(timings):
+    """{top-level package: (self µs summed over its modules, cumulative µs)}."""
+    packages = {}
+    for name, (self_us, cumulative_us) in timings.items():
+        package = name.partition(".")[0]
+        total_self, total_cumulative = packages.get(package, (0, 0))
+        # A package's own cumulative time already covers its submodules
+        packages[package] = (total_self + self_us, cumulative_us if name == package else total_cumulative)
+    return packages
+
+
+def run(module, repeat):
+    runs = [measure(module) for _ in range(repeat)]
+    packages = {}
+    for timings in runs:
+        for package, (self_us, cumulative_us) in by_package(timings).items():
+            packages.setdefault(package, []).append((self_us, cumulative_us))
+    rows = [
+        {
+            "package": package,
+            "self_ms": statistics.median(s for s, _ in samples) / 1000,
+            "cumulative_ms": statistics.median(c for _, c in samples) / 1000,
+            "runs": len(samples),
+        }
+        for package, samples in packages.items()
+    ]
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    total_ms = statistics.median(timings[module][1] for timings in runs) / 1000
+    return {"module": module, "total_ms": total_ms, "packages": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and check the import time of the dashboard.")
+    parser.add_argument("--module", default="functions", help="module to import")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, help="fail if importing the module takes longer")
+    parser.add_argument("--forbid", nargs="*", default=FORBIDDEN, help="packages that must not be imported")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.module, args.repeat)
+    if args.json:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    else:
+        print(f"import {args.module}: {report['total_ms']:.1f} ms (median of {args.repeat})")
+        print(f"{'package':<28}{'self ms':>10}{'cumul. ms':>12}")
+        for row in report["packages"][:args.top]:
+            print(f"{row['package']:<28}{row['self_ms']:>10.1f}{row['cumulative_ms']:>12.1f}")
+
+    failures = []
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        failures.append(f"import {args.module} took {report['total_ms']:.1f} ms, over the {args.budget_ms:g} ms budget")
+    loaded = {row["package"] for row in report["packages"]}
+    for package in args.forbid:
+        if package in loaded:
+            failures.append(f"{package} is imported at startup")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
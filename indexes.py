@@ -0,0 +1,128 @@
+"""Inverted indexes over a fetched collection for filter dropdowns and search.
+
+A RecordIndex is built once per records list (i.e. once per dataset refresh,
+since api_client hands back the same cached list until it expires) and maps
+
+- each facet value (status, agency, landing count, ...) to the sorted
+  positions of the records having it, with counts for the dropdowns;
+- every 1-, 2- and 3-character substring of each lower-cased name to the
+  positions of the names containing it, so substring search only has to
+  verify a handful of candidates instead of scanning the collection.
+
+Positions index into the records list the RecordIndex was built from.
+"""
+import numpy as np
+
+import memo
+
+GRAM = 3
+_MEMO_SIZE = 16
+
+
+def _postings(groups):
+    return {key: np.array(positions, dtype=np.int32) for key, positions in groups.items()}
+
+
+class Facet:
+    """Value -> positions of the records with that value."""
+
+    def __init__(self, records, key_of):
+        groups = {}
+        for i, record in enumerate(records):
+            groups.setdefault(key_of(record), []).append(i)
+        self._postings = _postings(groups)
+        self._counts = {value: len(positions) for value, positions in self._postings.items()}
+
+    def values(self, exclude=(None,)):
+        """Sorted distinct values, leaving out `exclude`."""
+        return sorted(v for v in self._counts if v not in exclude)
+
+    def count(self, value):
+        return self._counts.get(value, 0)
+
+    def counts(self):
+        return dict(self._counts)
+
+    def positions(self, value):
+        return self._postings.get(value, np.empty(0, dtype=np.int32))
+
+
+class NameIndex:
+    """Case-insensitive substring search over record names via n-grams."""
+
+    def __init__(self, records, name_of):
+        self.names = [(name_of(r) or "").lower() for r in records]
+        groups = {}
+        for i, name in enumerate(self.names):
+            grams = set()
+            for n in range(1, GRAM + 1):
+                grams.update(name[j:j + n] for j in range(len(name) - n + 1))
+            for gram in grams:
+                groups.setdefault(gram, []).append(i)
+        self._postings = _postings(groups)
+
+    def search(self, query):
+        """Sorted positions of names containing `query`; everything if empty."""
+        query = (query or "").lower()
+        if not query:
+            return np.arange(len(self.names), dtype=np.int32)
+        n = min(GRAM, len(query))
+        grams = {query[j:j + n] for j in range(len(query) - n + 1)}
+        postings = sorted((self._postings.get(g) for g in grams), key=lambda p: -1 if p is None else len(p))
+        if postings[0] is None:
+            return np.empty(0, dtype=np.int32)
+        candidates = postings[0]
+        for p in postings[1:]:
+            candidates = np.intersect1d(candidates, p, assume_unique=True)
+        if len(query) <= GRAM:
+            return candidates
+        # Every gram present doesn't mean they're adjacent; confirm the match
+        return np.array([i for i in candidates if query in self.names[i]], dtype=np.int32)
+
+
+class RecordIndex:
+    def __init__(self, records, facets=None, name_of=None):
+        self.records = records
+        self.facets = {name: Facet(records, key_of) for name, key_of in (facets or {}).items()}
+        self.names = NameIndex(records, name_of) if name_of else None
+
+    def positions(self, values=None, name=None):
+        """Sorted positions matching every facet in `values` and the name query.
+
+        Facets whose value is None are not filtered on.
+        """
+        result = None
+        for facet, value in (values or {}).items():
+            if value is None:
+                continue
+            positions = self.facets[facet].positions(value)
+            result = positions if result is None else np.intersect1d(result, positions, assume_unique=True)
+        if name:
+            matches = self.names.search(name)
+            result = matches if result is None else np.intersect1d(result, matches, assume_unique=True)
+        return np.arange(len(self.records), dtype=np.int32) if result is None else result
+
+    def select(self, values=None, name=None, limit=None):
+        """Matching records in their original order."""
+        return [self.records[i] for i in self.positions(values, name)[:limit]]
+
+
+def _nbytes(index):
+    postings = [p for facet in index.facets.values() for p in facet._postings.values()]
+    if index.names is not None:
+        postings.extend(index.names._postings.values())
+    return sum(p.nbytes for p in postings)
+
+
+_memo = memo.IdentityMemo(max_entries=_MEMO_SIZE, weigh=_nbytes)
+forget = _memo.forget
+
+
+def memo_stats():
+    """Number of memoized indexes and the bytes held by their posting arrays."""
+    return _memo.stats()
+
+
+def index_for(kind, records, facets=None, name_of=None):
+    """The RecordIndex of `kind` for `records`, built on first use."""
+    return _memo.get_or_build(records, lambda: RecordIndex(records, facets, name_of), kind)
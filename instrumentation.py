@@ -0,0 +1,159 @@
+"""Opt-in per-rerun timing spans.
+
+main() calls start_run() when the sidebar "Performance panel" toggle (or
+SPACEDEVS_INSTRUMENT=1) is on; every span() opened during that script run
+is then recorded, including spans opened on worker threads started through
+bind(). Outside a run span() is a near no-op, so the hooks can stay in the
+hot paths.
+
+Each span records its name, kind (the part of the name before the first
+dot, e.g. "http" or "filter"), start offset, duration, parent span and any
+attributes set on it, such as bytes transferred and cache hit/miss.
+finish_run() optionally appends the spans to the JSON-lines file named by
+SPACEDEVS_SPAN_LOG.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+ENABLED = os.environ.get("SPACEDEVS_INSTRUMENT", "") not in ("", "0")
+SPAN_LOG = os.environ.get("SPACEDEVS_SPAN_LOG")
+
+_run = ContextVar("instrumentation_run", default=None)
+_parent = ContextVar("instrumentation_parent", default=None)
+
+
+class Run:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.duration = None
+        self.spans = []
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def _new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def summary(self):
+        """Total time, count, bytes and cache hits/misses per span kind."""
+        kinds = {}
+        for s in self.spans:
+            k = kinds.setdefault(s["kind"], {"kind": s["kind"], "count": 0, "seconds": 0.0,
+                                             "bytes": 0, "cache_hits": 0, "cache_misses": 0})
+            k["count"] += 1
+            k["seconds"] += s["duration"]
+            k["bytes"] += s.get("bytes") or 0
+            if s.get("cache") == "hit":
+                k["cache_hits"] += 1
+            elif s.get("cache") == "miss":
+                k["cache_misses"] += 1
+        return sorted(kinds.values(), key=lambda k: k["seconds"], reverse=True)
+
+
+def start_run():
+    run = Run()
+    _run.set(run)
+    _parent.set(None)
+    return run
+
+
+def finish_run(run, log_path=None):
+    run.duration = time.perf_counter() - run.started
+    _run.set(None)
+    log_path = log_path or SPAN_LOG
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            for s in run.spans:
+                f.write(json.dumps(dict(s, run_id=run.id, run_started_at=run.started_at)) + "\n")
+    return run
+
+
+def active():
+    return _run.get() is not None
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block; yields a dict for attributes like bytes/cache."""
+    run = _run.get()
+    if run is None:
+        yield attrs
+        return
+    span_id = run._new_id()
+    token = _parent.set(span_id)
+    started = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        _parent.reset(token)
+        record = {
+            "id": span_id,
+            "parent": _parent.get(),
+            "name": name,
+            "kind": name.split(".", 1)[0],
+            "start": started - run.started,
+            "duration": time.perf_counter() - started,
+            "thread": threading.current_thread().name,
+        }
+        record.update(attrs)
+        run.spans.append(record)
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _run.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(fn):
+    """Wrap `fn` so calls on worker threads record into the caller's run."""
+    context = copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Each call gets its own copy: a Context can't be entered by two threads at once
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def render_panel(run):
+    """Show the run's timing breakdown in the Streamlit sidebar."""
+    import streamlit as st
+
+    with st.sidebar:
+        st.subheader("Performance")
+        st.caption(f"Rerun took {run.duration * 1000:.0f} ms, {len(run.spans)} spans")
+        st.dataframe(
+            [
+                {"kind": k["kind"], "count": k["count"], "ms": round(k["seconds"] * 1000, 1),
+                 "KB": round(k["bytes"] / 1024, 1), "hits": k["cache_hits"], "misses": k["cache_misses"]}
+                for k in run.summary()
+            ],
+            hide_index=True,
+        )
+        with st.expander("Spans"):
+            st.dataframe(
+                [
+                    {"name": s["name"], "start ms": round(s["start"] * 1000, 1),
+                     "ms": round(s["duration"] * 1000, 1), "bytes": s.get("bytes"), "cache": s.get("cache"),
+                     "thread": s["thread"]}
+                    for s in sorted(run.spans, key=lambda s: s["start"])
+                ],
+                hide_index=True,
+            )
@@ -0,0 +1,138 @@
+"""Time-sorted launches with provider and year groupings for the Launch Data tabs.
+
+A LaunchBrowser keeps the launches' sort keys, (window_start, id), in one
+sorted list. ISO-8601 UTC timestamps sort as text, so all launches of a
+year (or a range of years) are a contiguous slice found with two binary
+searches. Each provider keeps its own sorted key list, so a provider/year
+cross-filter is a slice of that list instead of a scan.
+
+When the launches dataset is refreshed, browser_for() derives the new
+browser from the previous one: launches whose start time and provider are
+unchanged keep their keys, only the groups of providers that gained or
+lost launches are copied and edited, and untouched groups are shared with
+the previous browser (which sessions still showing the old snapshot may be
+reading, so it is never modified).
+"""
+import bisect
+import threading
+
+import memo
+
+_MEMO_SIZE = 4
+
+
+def _key(launch):
+    # Launches without a start time sort first, before any year
+    return (launch.window_start or "", str(launch.id))
+
+
+def _year_bound(year):
+    # ("2020",) sorts before every "2020-..." key and after all of 2019
+    return (f"{year:04d}",)
+
+
+class LaunchBrowser:
+    def __init__(self, launches, base=None):
+        """Group `launches` (records.Launch), reusing `base`'s structures where nothing changed."""
+        self._records = {}
+        self._rank = {}
+        for i, launch in enumerate(launches):
+            key = _key(launch)
+            if key[1] not in self._records:
+                self._records[key[1]] = launch
+                self._rank[key[1]] = i
+
+        if base is None:
+            self._keys = sorted(_key(l) for l in self._records.values())
+            groups = {}
+            for key in self._keys:
+                groups.setdefault(self._records[key[1]].provider, []).append(key)
+            self._by_provider = groups
+        else:
+            self._update_from(base)
+
+    def _update_from(self, base):
+        removed, added = [], []
+        for launch_id, old in base._records.items():
+            new = self._records.get(launch_id)
+            if new is None or (new.window_start, new.provider) != (old.window_start, old.provider):
+                removed.append((_key(old), old.provider))
+        for launch_id, new in self._records.items():
+            old = base._records.get(launch_id)
+            if old is None or (new.window_start, new.provider) != (old.window_start, old.provider):
+                added.append((_key(new), new.provider))
+
+        if not removed and not added:
+            self._keys, self._by_provider = base._keys, base._by_provider
+            return
+
+        keys = list(base._keys)
+        by_provider = dict(base._by_provider)
+        copied = set()
+
+        def group(provider):
+            if provider not in copied:
+                by_provider[provider] = list(by_provider.get(provider, ()))
+                copied.add(provider)
+            return by_provider[provider]
+
+        for key, provider in removed:
+            del keys[bisect.bisect_left(keys, key)]
+            provider_keys = group(provider)
+            del provider_keys[bisect.bisect_left(provider_keys, key)]
+        for key, provider in added:
+            bisect.insort(keys, key)
+            bisect.insort(group(provider), key)
+        # Only now, so a provider that lost and gained launches keeps its group
+        for provider in copied:
+            if not by_provider[provider]:
+                del by_provider[provider]
+
+        self._keys = keys
+        self._by_provider = by_provider
+
+    def __len__(self):
+        return len(self._keys)
+
+    def select(self, provider=None, years=None, top=None, limit=None):
+        """Matching launches in start-time order.
+
+        `years` is an inclusive (first, last) pair. `top` only considers the
+        first `top` launches of the list the browser was built from.
+        """
+        keys = self._keys if provider is None else self._by_provider.get(provider, [])
+        start, stop = 0, len(keys)
+        if years is not None:
+            first, last = years
+            start = bisect.bisect_left(keys, _year_bound(first))
+            stop = bisect.bisect_left(keys, _year_bound(last + 1))
+        launches = []
+        for key in keys[start:stop]:
+            if top is not None and self._rank[key[1]] >= top:
+                continue
+            launches.append(self._records[key[1]])
+            if limit is not None and len(launches) >= limit:
+                break
+        return launches
+
+
+_memo = memo.IdentityMemo(max_entries=_MEMO_SIZE)
+_latest = None  # base for the next browser built for a new list
+_latest_lock = threading.Lock()
+
+# The most recent browser stays the base for the next one after this
+forget = _memo.forget
+
+
+def browser_for(launches):
+    """The LaunchBrowser for `launches`, derived from the last one built if it is new."""
+    global _latest
+    browser = _memo.get(launches)
+    if browser is not None:
+        return browser
+    with _latest_lock:
+        base = _latest
+    browser = _memo.setdefault(launches, LaunchBrowser(launches, base))
+    with _latest_lock:
+        _latest = browser
+    return browser
@@ -0,0 +1,95 @@
+"""Memo for structures derived from a records list, keyed on its identity.
+
+The dataset store (see refresher.py) hands every session the same records
+list until a refresh replaces it, so anything computed from a list, like
+columns, indexes or export files, can be shared as long as that list is
+alive. A memo entry holds the list itself, which keeps its id() from being
+reused by a different list while the entry exists. forget() is meant to be
+registered with refresher.on_swap() so entries go with their snapshot.
+"""
+import threading
+from collections import OrderedDict
+
+
+class IdentityMemo:
+    """LRU map from (records list, key) to a derived value, safe across threads.
+
+    Entries beyond `max_entries`, or beyond `max_weight` by the sum of
+    `weigh(value)`, are dropped least recently used first (but never the
+    newest one).
+    """
+
+    def __init__(self, max_entries=None, weigh=None, max_weight=None):
+        self.max_entries = max_entries
+        self.weigh = weigh
+        self.max_weight = max_weight
+        self._entries = OrderedDict()  # (id(records), key) -> (records, value)
+        self._lock = threading.Lock()
+
+    def get(self, records, key=None):
+        """The value stored for `records` and `key`, or None."""
+        with self._lock:
+            entry = self._entries.get((id(records), key))
+            if entry is None or entry[0] is not records:
+                return None
+            self._entries.move_to_end((id(records), key))
+            return entry[1]
+
+    def setdefault(self, records, value, key=None):
+        """Store `value` unless there already is one; return the stored value."""
+        with self._lock:
+            entry = self._entries.get((id(records), key))
+            if entry is not None and entry[0] is records:
+                self._entries.move_to_end((id(records), key))
+                return entry[1]
+            self._entries[(id(records), key)] = (records, value)
+            self._evict()
+            return value
+
+    def get_or_build(self, records, build, key=None):
+        """The value for `records` and `key`, calling build() on a miss.
+
+        build() runs outside the lock; if two callers race, both build and
+        the first value stored wins.
+        """
+        value = self.get(records, key)
+        if value is None:
+            value = self.setdefault(records, build(), key)
+        return value
+
+    def discard(self, records, key=None, value=None):
+        """Drop the entry for `records` and `key` (only if it holds `value`, when given)."""
+        with self._lock:
+            entry = self._entries.get((id(records), key))
+            if entry is not None and entry[0] is records and (value is None or entry[1] is value):
+                del self._entries[(id(records), key)]
+
+    def forget(self, records):
+        """Drop every entry for `records`, e.g. once a newer snapshot replaces it."""
+        with self._lock:
+            for k in [k for k, (cached, _) in self._entries.items() if cached is records]:
+                del self._entries[k]
+
+    def values(self):
+        with self._lock:
+            return [value for _, value in self._entries.values()]
+
+    def stats(self):
+        """Number of entries and their total weight (0 without `weigh`)."""
+        values = self.values()
+        return {"entries": len(values), "bytes": sum(self.weigh(v) for v in values) if self.weigh else 0}
+
+    def trim(self):
+        """Apply the limits again, e.g. once values have grown since they were stored."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held
+        def over():
+            if self.max_entries is not None and len(self._entries) > self.max_entries:
+                return True
+            return (self.max_weight is not None
+                    and sum(self.weigh(v) for _, v in self._entries.values()) > self.max_weight)
+        while len(self._entries) > 1 and over():
+            self._entries.popitem(last=False)
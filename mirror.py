@@ -0,0 +1,272 @@
+"""Local SQLite mirror of SpaceDevs entities.
+
+Each entity type gets a table holding the raw JSON payload plus indexed
+columns for the fields the UI filters on. The columns hold the values the
+record parsers in records.py produce (e.g. "Unknown" for a missing status),
+so a filter pushed down to SQL matches exactly what the app shows.
+
+sync() pulls only records whose `last_updated` is at or after the newest
+one already stored; if the API ignores that filter for an endpoint, the
+full collection comes back and is simply upserted again.
+
+With SPACEDEVS_DATA_SOURCE=mirror the fetch_* stages in functions.py read
+from here instead of the network, via fetch(), which accepts the same
+query parameters as the API for the columns it indexes.
+
+Run `python mirror.py` (optionally with entity names or --full) to sync.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import api_client
+import records
+
+DB_PATH = os.environ.get(
+    "SPACEDEVS_MIRROR_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "mirror.sqlite3"),
+)
+DATA_SOURCE = os.environ.get("SPACEDEVS_DATA_SOURCE", "api")
+
+
+# entity -> endpoint, base query, default ordering and indexed columns as
+# (column, SQL type); each column is the record attribute of the same name
+ENTITIES = {
+    "celestial_bodies": {
+        "endpoint": "/2.3.0/celestial_bodies/",
+        "params": {"mode": "detailed"},
+        "order_by": "id",
+        "columns": [
+            ("name", "TEXT"),
+        ],
+    },
+    "astronauts": {
+        "endpoint": "/2.3.0/astronauts/",
+        "params": {},
+        "order_by": "id",
+        "columns": [
+            ("name", "TEXT"),
+            ("agency", "TEXT"),
+            ("nationality", "TEXT"),
+            ("status", "TEXT"),
+            ("flights_count", "INTEGER"),
+        ],
+    },
+    "spacecraft": {
+        "endpoint": "/2.3.0/spacecraft/",
+        "params": {"mode": "detailed"},
+        "order_by": "id",
+        "columns": [
+            ("name", "TEXT"),
+            ("status", "TEXT"),
+            ("in_space", "BOOLEAN"),
+        ],
+    },
+    "launchers": {
+        "endpoint": "/2.3.0/launchers/",
+        "params": {"mode": "detailed"},
+        "order_by": "id",
+        "columns": [
+            ("name", "TEXT"),
+            ("status", "TEXT"),
+            ("flight_proven", "BOOLEAN"),
+            ("attempted_landings", "INTEGER"),
+            ("successful_landings", "INTEGER"),
+        ],
+    },
+    "launches": {
+        "endpoint": "/2.0.0/launch/",
+        "params": {},
+        "order_by": "window_start",
+        "columns": [
+            ("name", "TEXT"),
+            ("provider", "TEXT"),
+            ("window_start", "TEXT"),
+        ],
+    },
+}
+
+# Bumped whenever what the indexed columns hold changes; older databases
+# have their columns recomputed from the stored payloads when opened
+SCHEMA_VERSION = 1
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def enabled():
+    return DATA_SOURCE == "mirror"
+
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        _create_schema(conn)
+        _local.conn = conn
+    return conn
+
+
+def _create_schema(conn):
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "entity TEXT PRIMARY KEY, watermark TEXT, synced_at REAL)"
+        )
+        for entity, config in ENTITIES.items():
+            columns = "".join(f", {name} {sql_type}" for name, sql_type in config["columns"])
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {entity} ("
+                f"id PRIMARY KEY, last_updated TEXT{columns}, payload TEXT NOT NULL)"
+            )
+            for name, _ in config["columns"]:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {entity}_{name} ON {entity} ({name})")
+    with _write_lock, conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _reindex(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _reindex(conn):
+    for entity, config in ENTITIES.items():
+        assignments = ", ".join(f"{name} = ?" for name, _ in config["columns"])
+        rows = conn.execute(f"SELECT id, payload FROM {entity}").fetchall()
+        conn.executemany(
+            f"UPDATE {entity} SET {assignments} WHERE id = ?",
+            [_columns(entity, json.loads(payload)) + [record_id] for record_id, payload in rows],
+        )
+
+
+def _columns(entity, record):
+    parsed = records.PARSERS[entity](record)
+    return [getattr(parsed, name) for name, _ in ENTITIES[entity]["columns"]]
+
+
+def _row(entity, record):
+    values = [record["id"], record.get("last_updated")]
+    values += _columns(entity, record)
+    values.append(json.dumps(record, separators=(",", ":")))
+    return values
+
+
+def sync(entity, full=False):
+    """Pull new and changed records for `entity`; return how many were stored."""
+    config = ENTITIES[entity]
+    conn = _connect()
+    watermark = None
+    if not full:
+        row = conn.execute("SELECT watermark FROM sync_state WHERE entity = ?", (entity,)).fetchone()
+        watermark = row[0] if row else None
+
+    params = dict(config["params"])
+    if watermark:
+        params["last_updated__gte"] = watermark
+
+    columns = ["id", "last_updated"] + [name for name, _ in config["columns"]] + ["payload"]
+    insert = (
+        f"INSERT OR REPLACE INTO {entity} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    stored = 0
+    newest = watermark
+    for results in api_client.iter_pages(config["endpoint"], params, use_cache=False):
+        rows = [_row(entity, record) for record in results]
+        for record in results:
+            updated = record.get("last_updated")
+            if updated and (newest is None or updated > newest):
+                newest = updated
+        with _write_lock, conn:
+            conn.executemany(insert, rows)
+        stored += len(rows)
+
+    with _write_lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (entity, watermark, synced_at) VALUES (?, ?, ?)",
+            (entity, newest, time.time()),
+        )
+    return stored
+
+
+def sync_all(entities=None, full=False):
+    return {entity: sync(entity, full) for entity in (entities or ENTITIES)}
+
+
+def last_synced(entity):
+    row = _connect().execute("SELECT synced_at FROM sync_state WHERE entity = ?", (entity,)).fetchone()
+    return row[0] if row else None
+
+
+_OPERATORS = {"": "=", "gte": ">=", "lte": "<=", "gt": ">", "lt": "<"}
+
+
+def _where(config, params):
+    """Translate API-style params into a WHERE clause over indexed columns.
+
+    Supports `<column>`, `<column>__gte/__lte/__gt/__lt` and `search` (a
+    case-insensitive substring match on name). Parameters with no matching
+    column are ignored, as the API does with unknown filters.
+    """
+    types = {name: sql_type for name, sql_type in config["columns"]}
+    clauses, args = [], []
+    for key, value in (params or {}).items():
+        if key == "search":
+            clauses.append("name LIKE ?")
+            args.append(f"%{value}%")
+            continue
+        column, _, op = key.partition("__")
+        if column not in types or op not in _OPERATORS:
+            continue
+        if types[column] == "BOOLEAN":
+            value = 1 if str(value).lower() in ("true", "1") else 0
+        clauses.append(f"{column} {_OPERATORS[op]} ?")
+        args.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+
+def _order_by(config, params):
+    ordering = (params or {}).get("ordering")
+    if ordering:
+        column = ordering.lstrip("-")
+        if column in {name for name, _ in config["columns"]} | {"id", "last_updated"}:
+            return f" ORDER BY {column} {'DESC' if ordering.startswith('-') else 'ASC'}"
+    return f" ORDER BY {config['order_by']}"
+
+
+def fetch(entity, params=None, want=None, predicate=None, parse=None):
+    """Mirror counterpart of api_client.fetch_all() for `entity`."""
+    config = ENTITIES[entity]
+    where, args = _where(config, params)
+    cursor = _connect().execute(f"SELECT payload FROM {entity}{where}{_order_by(config, params)}", args)
+    records = []
+    matches = 0
+    for (payload,) in cursor:
+        record = json.loads(payload)
+        if parse is not None:
+            record = parse(record)
+        records.append(record)
+        if want is not None:
+            matches += 1 if predicate is None or predicate(record) else 0
+            if matches >= want:
+                break
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the local SpaceDevs mirror.")
+    parser.add_argument("entities", nargs="*", help=f"entity types to sync (default: all of {', '.join(ENTITIES)})")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and pull everything")
+    args = parser.parse_args()
+    unknown = set(args.entities) - set(ENTITIES)
+    if unknown:
+        parser.error(f"unknown entity type(s): {', '.join(sorted(unknown))}")
+    for entity, stored in sync_all(args.entities, args.full).items():
+        print(f"{entity}: {stored} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Turn sd_* filter specs into SpaceDevs API query parameters.
+
+build_query() splits a filter spec into the query parameters the API can
+evaluate server-side and a residual spec that still has to be checked in
+Python. Only predicates with a known API equivalent are pushed down:
+
+- exact pushdowns are dropped from the residual spec, since the API
+  applies precisely the same test;
+- inexact ones (e.g. `search`, which also matches fields other than the
+  name) only narrow the payload and stay in the residual spec.
+
+Filters on display names (agency, nationality, status) stay local: the API
+filters those by numeric id, which the UI does not have. The SQLite mirror
+(mirror.py) indexes those names, so with mirror=True they are pushed too.
+"""
+from collections import namedtuple
+
+Pushdown = namedtuple("Pushdown", ["param", "encode", "exact"])
+
+
+def _bool(value):
+    return "true" if value else "false"
+
+
+PUSHDOWN = {
+    "celestial_bodies": {
+        "name_filter": Pushdown("search", str, exact=False),
+    },
+    "astronauts": {
+        "min_flights": Pushdown("flights_count__gte", int, exact=True),
+        "max_flights": Pushdown("flights_count__lte", int, exact=True),
+    },
+    "spacecraft": {
+        "in_space_filter": Pushdown("in_space", _bool, exact=True),
+    },
+    "launchers": {
+        "flight_proven_filter": Pushdown("flight_proven", _bool, exact=True),
+    },
+}
+
+MIRROR_PUSHDOWN = {
+    "celestial_bodies": PUSHDOWN["celestial_bodies"],
+    "astronauts": dict(
+        PUSHDOWN["astronauts"],
+        agency_filter=Pushdown("agency", str, exact=True),
+        nationality_filter=Pushdown("nationality", str, exact=True),
+    ),
+    "spacecraft": dict(
+        PUSHDOWN["spacecraft"],
+        status_filter=Pushdown("status", str, exact=True),
+    ),
+    "launchers": dict(
+        PUSHDOWN["launchers"],
+        status_filter=Pushdown("status", str, exact=True),
+        attempted_landings_filter=Pushdown("attempted_landings", int, exact=True),
+        successful_landings_filter=Pushdown("successful_landings", int, exact=True),
+    ),
+}
+
+# Spec keys forwarded to the API as-is for every entity type.
+PASSTHROUGH = ("ordering",)
+
+
+def build_query(entity, spec, mirror=False):
+    """Return (params, residual_spec) for `spec` against `entity`'s endpoint,
+    or against the local mirror's table when `mirror` is true."""
+    params = {}
+    residual = {}
+    rules = (MIRROR_PUSHDOWN if mirror else PUSHDOWN).get(entity, {})
+    for key, value in (spec or {}).items():
+        if value is None or value == "":
+            continue
+        if key in PASSTHROUGH:
+            params[key] = value
+            continue
+        rule = rules.get(key)
+        if rule is None:
+            residual[key] = value
+            continue
+        params[rule.param] = rule.encode(value)
+        if not rule.exact:
+            residual[key] = value
+    return params, residual
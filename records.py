@@ -0,0 +1,152 @@
+"""Compact, slotted record types for the SpaceDevs entities.
+
+Each endpoint's JSON is normalized once, by the from_api() parser of its
+record class, into an object holding only the fields the app filters on,
+renders or exports. Nested objects are flattened to the names we show,
+image URLs are resolved from whichever shape the API used, and the long
+fields the UI never touches are dropped, so a record costs a fraction of
+the decoded JSON and loops read plain attributes instead of chained
+dict lookups.
+
+A missing field is None unless noted otherwise on the parser.
+"""
+
+
+def _name(obj):
+    return obj.get("name") if isinstance(obj, dict) else None
+
+
+def _status(raw):
+    return (raw.get("status") or {}).get("name", "Unknown")
+
+
+def image_url(raw):
+    """Image URL from either {"image": {"image_url": ...}} or a top-level "image_url"."""
+    image_field = raw.get("image")
+    if isinstance(image_field, dict):
+        image = image_field.get("image_url") or image_field.get("url")
+        if image:
+            return image
+    return raw.get("image_url")
+
+
+class Record:
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CelestialBody(Record):
+    __slots__ = ("id", "name", "description", "diameter", "mass", "gravity", "image_url")
+
+    @classmethod
+    def from_api(cls, raw):
+        return cls(
+            id=raw.get("id"),
+            name=raw.get("name", "Unknown"),
+            description=raw.get("description"),
+            diameter=raw.get("diameter"),
+            mass=raw.get("mass"),
+            gravity=raw.get("gravity"),
+            image_url=image_url(raw),
+        )
+
+
+class Astronaut(Record):
+    __slots__ = ("id", "name", "agency", "nationality", "status", "age", "date_of_birth",
+                 "flights_count", "last_flight", "image_url")
+
+    @classmethod
+    def from_api(cls, raw):
+        """agency and nationality default to "Unknown", flights_count to 0."""
+        nationality = raw.get("nationality")
+        return cls(
+            id=raw.get("id"),
+            name=raw.get("name", "Unknown"),
+            agency=(raw.get("agency") or {}).get("name", "Unknown"),
+            nationality=nationality[0].get("nationality_name", "Unknown") if nationality else "Unknown",
+            status=_status(raw),
+            age=raw.get("age"),
+            date_of_birth=raw.get("date_of_birth"),
+            flights_count=raw.get("flights_count") or 0,
+            last_flight=raw.get("last_flight"),
+            image_url=image_url(raw),
+        )
+
+
+class Spacecraft(Record):
+    __slots__ = ("id", "name", "description", "in_space", "status", "image_url")
+
+    @classmethod
+    def from_api(cls, raw):
+        """status defaults to "Unknown"."""
+        return cls(
+            id=raw.get("id"),
+            name=raw.get("name", "Unknown"),
+            description=raw.get("description"),
+            in_space=raw.get("in_space"),
+            status=_status(raw),
+            image_url=image_url(raw),
+        )
+
+
+class Launcher(Record):
+    __slots__ = ("id", "name", "serial_number", "details", "status", "flights", "flight_proven",
+                 "attempted_landings", "successful_landings", "image_url")
+
+    @classmethod
+    def from_api(cls, raw):
+        """name is the launcher configuration's full name when there is one; status defaults to "Unknown"."""
+        return cls(
+            id=raw.get("id"),
+            name=(raw.get("launcher_config") or {}).get("full_name") or raw.get("name") or "Unknown",
+            serial_number=raw.get("serial_number"),
+            details=raw.get("details"),
+            status=_status(raw),
+            flights=raw.get("flights"),
+            flight_proven=raw.get("flight_proven"),
+            attempted_landings=raw.get("attempted_landings"),
+            successful_landings=raw.get("successful_landings"),
+            image_url=image_url(raw),
+        )
+
+
+class Launch(Record):
+    __slots__ = ("id", "name", "provider", "rocket", "mission_name", "mission_type", "mission_description",
+                 "window_start", "window_end", "pad", "location")
+
+    @classmethod
+    def from_api(cls, raw):
+        mission = raw.get("mission") or {}
+        pad = raw.get("pad") or {}
+        return cls(
+            id=raw.get("id"),
+            name=raw.get("name"),
+            provider=_name(raw.get("launch_service_provider")),
+            rocket=_name((raw.get("rocket") or {}).get("configuration")),
+            mission_name=mission.get("name"),
+            mission_type=mission.get("type"),
+            mission_description=mission.get("description"),
+            window_start=raw.get("window_start"),
+            window_end=raw.get("window_end"),
+            pad=pad.get("name"),
+            location=_name(pad.get("location")),
+        )
+
+
+# entity -> parser for one record of that endpoint's `results`
+PARSERS = {
+    "celestial_bodies": CelestialBody.from_api,
+    "astronauts": Astronaut.from_api,
+    "spacecraft": Spacecraft.from_api,
+    "launchers": Launcher.from_api,
+    "launches": Launch.from_api,
+}
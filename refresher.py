@@ -0,0 +1,198 @@
+"""Process-wide dataset store with background refresh (stale-while-revalidate).
+
+There is one immutable Snapshot per dataset per process, shared by
+reference by every Streamlit session; a session keeps only its filter
+selections. Snapshot records are a tuple of parsed records (see
+records.py), which callers must treat as read-only. A refresh builds a new Snapshot and
+swaps it in atomically; callbacks registered with on_swap() are then
+given the old records so derived structures can be dropped with them.
+
+Datasets are registered with a loader, a zero-argument function returning
+the full list of records. A daemon thread loads every dataset as soon as
+start() is called and reloads any whose snapshot is older than
+REFRESH_INTERVAL. snapshot() never blocks: it returns the last good
+snapshot (however old) and, if it is stale, queues a refresh. A failed
+refresh keeps the previous records and records the error instead.
+
+The script run therefore only ever reads in-memory snapshots, so pages
+render without waiting on the network. Each snapshot's records list stays
+the same object until the next successful refresh, which lets the
+identity-keyed columnar and index structures be reused across reruns.
+"""
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import api_client
+import scheduler
+
+ENABLED = os.environ.get("SPACEDEVS_BACKGROUND_REFRESH", "1") not in ("", "0")
+REFRESH_INTERVAL = float(os.environ.get("SPACEDEVS_REFRESH_INTERVAL", api_client.CACHE_TTL))  # seconds
+REFRESH_WORKERS = int(os.environ.get("SPACEDEVS_REFRESH_WORKERS", 5))  # datasets loaded at once
+
+# records and fetched_at are None until the first successful load; error is
+# the message of the last failed load, cleared by the next successful one.
+# version counts successful loads; nbytes estimates the records' memory.
+Snapshot = namedtuple("Snapshot", "records fetched_at error refreshing version nbytes")
+
+_loaders = {}
+_swap_callbacks = []
+_snapshots = {}
+_in_flight = set()
+_lock = threading.Lock()
+_executor = None
+_thread = None
+
+
+def register(name, loader):
+    with _lock:
+        _loaders[name] = loader
+
+
+def on_swap(callback):
+    """Call callback(old_records) whenever a snapshot's records are replaced."""
+    _swap_callbacks.append(callback)
+
+
+def start():
+    """Start the background thread (once per process) and prefetch everything."""
+    global _executor, _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="spacedevs-refresh")
+        _thread = threading.Thread(target=_run, name="spacedevs-refresher", daemon=True)
+        _thread.start()
+
+
+def _run():
+    while True:
+        with _lock:
+            stale = [name for name in _loaders if _is_stale(name)]
+        for name in stale:
+            refresh(name)
+        time.sleep(max(1.0, REFRESH_INTERVAL / 10))
+
+
+def _is_stale(name):
+    snapshot = _snapshots.get(name)
+    # A failed load leaves fetched_at alone (None if nothing ever loaded), so
+    # it is retried on the next pass rather than after a full interval.
+    return snapshot is None or snapshot.fetched_at is None or snapshot.error is not None or \
+        time.time() - snapshot.fetched_at >= REFRESH_INTERVAL
+
+
+def refresh(name):
+    """Queue a reload of `name` unless one is already running."""
+    with _lock:
+        if name in _in_flight or _executor is None:
+            return
+        _in_flight.add(name)
+        loader = _loaders[name]
+    _executor.submit(_load, name, loader)
+
+
+def _load(name, loader):
+    try:
+        # Page renders waiting on the rate limiter go first
+        with scheduler.priority(scheduler.BACKGROUND):
+            records = tuple(loader())
+        nbytes = deep_size(records)
+    except Exception as exc:  # keep serving the last good records
+        with _lock:
+            previous = _snapshots.get(name)
+            if previous is None:
+                _snapshots[name] = Snapshot(None, None, str(exc) or type(exc).__name__, False, 0, 0)
+            else:
+                _snapshots[name] = previous._replace(error=str(exc) or type(exc).__name__)
+    else:
+        with _lock:
+            previous = _snapshots.get(name)
+            version = previous.version + 1 if previous else 1
+            _snapshots[name] = Snapshot(records, time.time(), None, False, version, nbytes)
+        if previous is not None and previous.records is not None:
+            for callback in _swap_callbacks:
+                callback(previous.records)
+    finally:
+        with _lock:
+            _in_flight.discard(name)
+
+
+def snapshot(name):
+    """The latest Snapshot of `name` (records None if never loaded); never blocks.
+
+    A stale snapshot is still returned, and a refresh is queued for it.
+    """
+    with _lock:
+        current = _snapshots.get(name)
+        stale = _is_stale(name)
+    if stale:
+        refresh(name)
+    with _lock:
+        refreshing = name in _in_flight
+    if current is None:
+        return Snapshot(None, None, None, refreshing, 0, 0)
+    return current._replace(refreshing=refreshing)
+
+
+def pending():
+    """Names of datasets with a load in flight."""
+    with _lock:
+        return set(_in_flight)
+
+
+def deep_size(obj):
+    """Approximate bytes held by `obj` and the containers and values inside it."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        else:
+            # Slotted records (records.py) have no __dict__ to find values in
+            for name in getattr(type(item), "__slots__", ()):
+                stack.append(getattr(item, name, None))
+    return total
+
+
+def memory_report():
+    """One row per dataset: record count, estimated bytes, age and version."""
+    with _lock:
+        snapshots = dict(_snapshots)
+    return [
+        {
+            "dataset": name,
+            "records": len(s.records) if s.records is not None else 0,
+            "bytes": s.nbytes,
+            "age_seconds": age(s),
+            "version": s.version,
+        }
+        for name, s in sorted(snapshots.items())
+    ]
+
+
+def age(snapshot):
+    """Seconds since the snapshot's records were fetched, or None."""
+    if snapshot.records is None:
+        return None
+    return time.time() - snapshot.fetched_at
+
+
+def describe_age(seconds):
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    return f"{seconds / 3600:.1f} h ago"
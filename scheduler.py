@@ -0,0 +1,168 @@
+"""Rate limiting, priorities and request coalescing for API calls.
+
+The SpaceDevs API enforces a per-client request quota. api_client takes a
+token from a TokenBucket sized to that quota before every request, and
+pauses the bucket when the API answers 429/503 with a Retry-After. Waiting
+requests are served by priority: requests made while rendering the page
+(FOREGROUND, the default) go ahead of background refreshes, which run
+under `with priority(BACKGROUND)`.
+
+Coalescer lets concurrent callers asking for the same thing share one
+upstream call. The state is per process, so it is shared by every
+Streamlit session.
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+
+FOREGROUND = 0
+BACKGROUND = 1
+
+_priority = ContextVar("request_priority", default=FOREGROUND)
+
+
+@contextmanager
+def priority(level):
+    """Make requests issued in this block (and work it hands off) use `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def parse_quota(text):
+    """"15/3600" (requests per seconds) -> (15, 3600.0); "" or "0" -> None."""
+    if not text or text == "0":
+        return None
+    requests, _, seconds = text.partition("/")
+    return int(requests), float(seconds or 1)
+
+
+def retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Blocking token bucket that grants tokens in priority order.
+
+    `quota` is (requests, seconds) as returned by parse_quota(); None means
+    no limit, though pause() still holds requests back.
+    """
+
+    def __init__(self, quota=None):
+        if quota is None:
+            self.rate = None
+            self.capacity = None
+        else:
+            requests, seconds = quota
+            self.rate = requests / seconds
+            self.capacity = requests
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, now):
+        """Seconds until the head of the queue could go; 0 if it can go now."""
+        wait = max(self.paused_until - now, 0.0)
+        if self.rate is not None and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def acquire(self, priority=FOREGROUND, timeout=None):
+        """Take a token, waiting behind higher-priority and earlier requests.
+
+        Returns False if `timeout` seconds pass first, like Lock.acquire().
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(now) if self._waiters[0] == ticket else None
+                    if wait == 0:
+                        heapq.heappop(self._waiters)
+                        if self.rate is not None:
+                            self.tokens -= 1
+                        self._cond.notify_all()
+                        return True
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._waiters.remove(ticket)
+                            heapq.heapify(self._waiters)
+                            self._cond.notify_all()
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def pause(self, seconds):
+        """Hold every request back for `seconds`, e.g. after a 429."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+class Coalescer:
+    """Share one call among concurrent callers with the same key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def run(self, key, fn):
+        """Return (fn() result, shared) where `shared` is True if another caller ran it."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
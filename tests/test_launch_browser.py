@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from launch_browser import LaunchBrowser
+from records import Launch
+
+PROVIDERS = ["SpaceX", "Rocket Lab", "Arianespace", None]
+
+
+def launch(launch_id, provider, window_start):
+    return Launch(id=launch_id, name=f"Launch {launch_id}", provider=provider, window_start=window_start)
+
+
+def random_launches(rng, ids):
+    return [
+        launch(i, rng.choice(PROVIDERS), rng.choice([None, f"20{rng.randint(18, 25)}-0{rng.randint(1, 9)}-01T00:00:00Z"]))
+        for i in ids
+    ]
+
+
+def selections(browser, size):
+    years = [None, (2018, 2025), (2020, 2020), (2022, 2024)]
+    return {
+        (provider, span, top): [l.id for l in browser.select(provider=provider, years=span, top=top)]
+        for provider in PROVIDERS + ["Nobody"]
+        for span in years
+        for top in (None, size // 2)
+    }
+
+
+def assert_same_as_fresh(old, new):
+    incremental = LaunchBrowser(new, LaunchBrowser(old))
+    fresh = LaunchBrowser(new)
+    assert len(incremental) == len(fresh)
+    assert incremental._by_provider == fresh._by_provider
+    assert selections(incremental, len(new)) == selections(fresh, len(new))
+
+
+def test_provider_whose_only_launch_slips():
+    old = [launch(1, "SpaceX", "2024-01-01T00:00:00Z"), launch(2, "Rocket Lab", "2024-02-01T00:00:00Z")]
+    new = [launch(1, "SpaceX", "2024-01-01T00:00:00Z"), launch(2, "Rocket Lab", "2024-02-03T00:00:00Z")]
+    assert_same_as_fresh(old, new)
+
+
+def test_provider_losing_all_launches():
+    old = [launch(1, "SpaceX", "2024-01-01T00:00:00Z"), launch(2, "Rocket Lab", "2024-02-01T00:00:00Z")]
+    new = [launch(1, "SpaceX", "2024-01-01T00:00:00Z")]
+    incremental = LaunchBrowser(new, LaunchBrowser(old))
+    assert "Rocket Lab" not in incremental._by_provider
+    assert incremental.select(provider="Rocket Lab") == []
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_incremental_matches_fresh(seed):
+    rng = random.Random(seed)
+    old_ids = rng.sample(range(40), rng.randint(0, 30))
+    new_ids = rng.sample(range(40), rng.randint(0, 30))
+    old = random_launches(rng, old_ids)
+    kept = {l.id: l for l in old if rng.random() < 0.7}
+    new = [kept.get(i) or random_launches(rng, [i])[0] for i in new_ids]
+    assert_same_as_fresh(old, new)
@@ -0,0 +1,135 @@
+"""Resized, recompressed card images served inline.
+
+Cards used to hot-link full-resolution images and shrink them in the
+browser. sources() instead returns, for each image URL, a JPEG data URI
+cropped and scaled to the card's width x height (the same "cover" fit the
+cards' CSS asks for), so the page only carries the pixels it shows.
+
+Thumbnails missing from the cache are built on a background pool while
+the card shows the original URL, so a first render never waits on image
+downloads; reruns after the build pick up the thumbnail. Source images
+are downloaded once into the image cache (see downloader.py) and
+thumbnails are stored in the same cache under a key derived from the URL
+and size, so they share its atomic writes, freshness and LRU limit.
+Anything that cannot be thumbnailed (download failure, unreadable image,
+Pillow missing, SPACEDEVS_THUMBNAILS=0) keeps the original URL.
+"""
+import base64
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import downloader
+import image_cache
+import instrumentation
+
+ENABLED = os.environ.get("SPACEDEVS_THUMBNAILS", "1") not in ("", "0")
+QUALITY = int(os.environ.get("SPACEDEVS_THUMBNAIL_QUALITY", 80))
+SCALE = float(os.environ.get("SPACEDEVS_THUMBNAIL_SCALE", 1))  # e.g. 2 for high-DPI screens
+WORKERS = int(os.environ.get("SPACEDEVS_THUMBNAIL_WORKERS", 2))  # batches built at once
+
+_pool = None
+_pending = set()  # cache keys of thumbnails queued or being built
+_failed = {}  # cache key -> time.monotonic() of a failed build, so it isn't retried every rerun
+RETRY_FAILED_AFTER = 300  # seconds
+_pending_lock = threading.Lock()
+
+
+def _cache_url(url, width, height):
+    return f"thumbnail:{width}x{height}@{SCALE:g}q{QUALITY}:{url}"
+
+
+def _resize(path, width, height):
+    """JPEG bytes of the image at `path` fitted to width x height, or None."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    size = (max(1, round(width * SCALE)), max(1, round(height * SCALE)))
+    try:
+        with Image.open(path) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                # Flatten transparency onto white; JPEG has no alpha channel
+                background = Image.new("RGB", image.size, "white")
+                rgba = image.convert("RGBA")
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                image = background
+            image = ImageOps.fit(image, size, Image.LANCZOS)
+            out = BytesIO()
+            image.save(out, "JPEG", quality=QUALITY, optimize=True, progressive=True)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return out.getvalue()
+
+
+def _cached(url, width, height):
+    meta = image_cache.lookup(_cache_url(url, width, height))
+    if meta is None or not image_cache.is_fresh(meta):
+        return None
+    return image_cache.read(_cache_url(url, width, height))
+
+
+def _data_uri(data):
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+def _build(urls, width, height):
+    """Download and thumbnail `urls` into the cache (runs on the background pool)."""
+    try:
+        for url, path in zip(urls, downloader.iter_files(urls)):
+            data = _resize(path, width, height) if path else None
+            if data is None:
+                with _pending_lock:
+                    _failed[_cache_url(url, width, height)] = time.monotonic()
+            else:
+                image_cache.store(_cache_url(url, width, height), data, {})
+    finally:
+        with _pending_lock:
+            _pending.difference_update(_cache_url(url, width, height) for url in urls)
+
+
+def _schedule(urls, width, height):
+    """Build thumbnails for `urls` in the background, skipping ones already queued."""
+    global _pool
+    now = time.monotonic()
+    with _pending_lock:
+        urls = [
+            url for url in urls
+            if _cache_url(url, width, height) not in _pending
+            and now - _failed.get(_cache_url(url, width, height), -RETRY_FAILED_AFTER) >= RETRY_FAILED_AFTER
+        ]
+        if not urls:
+            return
+        _pending.update(_cache_url(url, width, height) for url in urls)
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="spacedevs-thumbnails")
+    _pool.submit(_build, urls, width, height)
+
+
+@instrumentation.traced("transform.thumbnails")
+def sources(urls, width, height):
+    """Map each image URL to the src to use for a width x height card.
+
+    Only cached thumbnails are used; the rest map to their original URL
+    and are built on a background pool, so rendering never waits on image
+    downloads and a later rerun picks the thumbnails up.
+    """
+    urls = [url for url in dict.fromkeys(urls) if url]
+    if not ENABLED:
+        return {url: url for url in urls}
+
+    srcs = {}
+    missing = []
+    for url in urls:
+        data = _cached(url, width, height)
+        if data is None:
+            missing.append(url)
+            srcs[url] = url
+        else:
+            srcs[url] = _data_uri(data)
+    if missing:
+        _schedule(missing, width, height)
+    return srcs
@@ -0,0 +1,136 @@
+"""HTTP sessions with optional record/replay of every response.
+
+All outgoing requests (API pages, launch data, image downloads) are made
+through sessions from new_session(). SPACEDEVS_HTTP_MODE selects what they
+do:
+
+- "live" (default): talk to the network as usual;
+- "record": talk to the network and save every response under FIXTURES_DIR;
+- "replay": never touch the network; serve saved responses, sleeping
+  REPLAY_LATENCY seconds (plus size / REPLAY_BANDWIDTH) per request so
+  timings are realistic but deterministic. Unrecorded URLs raise
+  requests.ConnectionError.
+
+Each response is one gzip file named after sha1("METHOD URL"), holding a
+JSON header line (url, status, headers) followed by the raw body.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from io import BytesIO
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MODE = os.environ.get("SPACEDEVS_HTTP_MODE", "live")
+FIXTURES_DIR = os.environ.get(
+    "SPACEDEVS_FIXTURES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"),
+)
+REPLAY_LATENCY = float(os.environ.get("SPACEDEVS_REPLAY_LATENCY", 0))  # seconds per request
+REPLAY_BANDWIDTH = float(os.environ.get("SPACEDEVS_REPLAY_BANDWIDTH", 0))  # bytes/second, 0 = unlimited
+
+# Headers worth keeping; the rest (dates, cookies, CDN noise) only bloat fixtures.
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+def fixture_path(method, url, fixtures_dir=None):
+    key = hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+    return os.path.join(fixtures_dir or FIXTURES_DIR, key[:2], key + ".gz")
+
+
+def save_fixture(method, url, status, headers, body, fixtures_dir=None):
+    path = fixture_path(method, url, fixtures_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    header = {
+        "url": url,
+        "status": status,
+        "headers": {name: headers[name] for name in _KEPT_HEADERS if name in headers},
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def load_fixture(method, url, fixtures_dir=None):
+    """Return (status, headers, body) for a recorded request, or None."""
+    try:
+        with gzip.open(fixture_path(method, url, fixtures_dir), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    header_line, _, body = data.partition(b"\n")
+    header = json.loads(header_line)
+    return header["status"], header["headers"], body
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that saves every response it receives as a fixture."""
+
+    def __init__(self, fixtures_dir=None, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures_dir = fixtures_dir
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        body = response.content  # reads streamed bodies too; fine when recording
+        save_fixture(request.method, request.url, response.status_code, response.headers, body, self.fixtures_dir)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that answers requests from fixtures instead of the network."""
+
+    def __init__(self, fixtures_dir=None, latency=None, bandwidth=None):
+        super().__init__()
+        self.fixtures_dir = fixtures_dir
+        self.latency = REPLAY_LATENCY if latency is None else latency
+        self.bandwidth = REPLAY_BANDWIDTH if bandwidth is None else bandwidth
+
+    def send(self, request, **kwargs):
+        fixture = load_fixture(request.method, request.url, self.fixtures_dir)
+        if fixture is None:
+            raise requests.ConnectionError(f"No recorded response for {request.method} {request.url}", request=request)
+        status, headers, body = fixture
+
+        delay = self.latency + (len(body) / self.bandwidth if self.bandwidth else 0)
+        if delay:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def close(self):
+        pass
+
+
+def new_session(pool_maxsize=10, mode=None):
+    """Return a requests.Session wired for the current record/replay mode."""
+    mode = mode or MODE
+    session = requests.Session()
+    if mode == "replay":
+        adapter = ReplayAdapter()
+    elif mode == "record":
+        adapter = RecordingAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    elif mode == "live":
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    else:
+        raise ValueError(f"Unknown SPACEDEVS_HTTP_MODE {mode!r}; expected live, record or replay")
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session